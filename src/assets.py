@@ -0,0 +1,124 @@
+import pygame
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List
+from support import import_folders, import_surface
+
+# Unused assets kept around for a quick re-acquire before the oldest are freed
+UNUSED_ASSET_BYTES = 32 * 1024 * 1024
+
+
+class AssetEntry:
+    """A loaded asset, the number of holders and the pixel memory it takes."""
+    __slots__ = ('value', 'references', 'memory')
+
+    def __init__(self, value: Any, memory: int):
+        self.value = value
+        self.references = 0
+        self.memory = memory
+
+
+class AssetManager:
+    """
+    Loads every asset once and shares it between everything that acquires it.
+    Assets are keyed by what they were made from, e.g. ('surface', path) or
+    ('material', texture, palette), and hold a surface, a list or a dict of them.
+    Holders release what they acquired. Assets nobody holds stay cached until
+    their memory goes over unused_limit, or until collect is called.
+    """
+    def __init__(self, unused_limit: int = UNUSED_ASSET_BYTES):
+        self.unused_limit = unused_limit
+        self.entries: Dict[Hashable, AssetEntry] = {}
+        # Keys of the entries without holders, the oldest released first
+        self.unused: OrderedDict = OrderedDict()
+        self.memory = 0
+        self.unused_memory = 0
+
+    def acquire(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Get the asset for key, calling load to make it if it is not loaded."""
+        entry = self.entries.get(key)
+        if entry is None:
+            value = load()
+            entry = AssetEntry(value, self._value_bytes(value))
+            self.entries[key] = entry
+            self.memory += entry.memory
+        elif key in self.unused:
+            del self.unused[key]
+            self.unused_memory -= entry.memory
+        entry.references += 1
+        return entry.value
+
+    def get(self, key: Hashable) -> Any:
+        """Get a loaded asset without holding it, None if it is not loaded."""
+        entry = self.entries.get(key)
+        return entry.value if entry is not None else None
+
+    def release(self, key: Hashable):
+        """Give back an asset that was acquired, it is freed later once nobody holds it."""
+        entry = self.entries.get(key)
+        if entry is None or entry.references == 0:
+            return
+        entry.references -= 1
+        if entry.references == 0:
+            self.unused[key] = None
+            self.unused_memory += entry.memory
+            while self.unused_memory > self.unused_limit:
+                self._free(next(iter(self.unused)))
+
+    def collect(self):
+        """Free every asset nobody holds."""
+        for key in list(self.unused):
+            self._free(key)
+
+    def clear(self):
+        """Free every asset, held or not, for when everything holding them is gone."""
+        self.entries.clear()
+        self.unused.clear()
+        self.memory = 0
+        self.unused_memory = 0
+
+    def _free(self, key: Hashable):
+        entry = self.entries.pop(key)
+        del self.unused[key]
+        self.memory -= entry.memory
+        self.unused_memory -= entry.memory
+
+    # Helpers for the common keys
+    def acquire_surface(self, path: str) -> pygame.Surface:
+        """Get the image at path, converted for the display."""
+        return self.acquire(('surface', path), lambda: import_surface(path))
+
+    def acquire_folders(self, paths: List[str]) -> Dict[str, List[pygame.Surface]]:
+        """Get the images of each folder like import_folder, decoding the folders not loaded yet together."""
+        missing = [path for path in paths if ('folder', path) not in self.entries]
+        loaded = import_folders(missing) if missing else {}
+        return {path: self.acquire(('folder', path), lambda path=path: loaded[path]) for path in paths}
+
+    def release_folders(self, paths: List[str]):
+        for path in paths:
+            self.release(('folder', path))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Number of assets, how many nobody holds, and the pixel memory of both in bytes."""
+        return {
+            'assets': len(self.entries),
+            'unused': len(self.unused),
+            'memory': self.memory,
+            'unused_memory': self.unused_memory,
+        }
+
+    @classmethod
+    def _value_bytes(cls, value: Any) -> int:
+        """Pixel memory of the surfaces in an asset, subsurfaces share their parent's pixels."""
+        if isinstance(value, pygame.Surface):
+            if value.get_parent() is not None:
+                return 0
+            return value.get_width() * value.get_height() * value.get_bytesize()
+        if isinstance(value, dict):
+            return sum(cls._value_bytes(item) for item in value.values())
+        if isinstance(value, (list, tuple)):
+            return sum(cls._value_bytes(item) for item in value)
+        return 0
+
+
+# Shared by everything that loads art
+assets = AssetManager()
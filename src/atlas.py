@@ -0,0 +1,84 @@
+import json
+import os
+import pygame
+from assets import assets
+from typing import Dict, List, Optional, Tuple
+
+ATLAS_DIRECTORY = 'target/atlas'
+ATLAS_INDEX = f'{ATLAS_DIRECTORY}/index.json'
+ATLAS_VERSION = 1
+
+
+class TextureAtlas:
+    """
+    Textures packed into a few sheets by AssetPostprocessor.pack_atlas.
+    The sheets are decoded once, textures are handed out as subsurfaces of them.
+
+    Texture names are paths below assets/textures without the extension, e.g.
+    'faces/grass_block_top' or 'character/down/0'. Material variants are named
+    '{texture}@{palette}', e.g. 'item/axe@material/iridium'.
+    """
+    def __init__(self, index: Dict, directory: str = ATLAS_DIRECTORY):
+        self.sheets: List[pygame.Surface] = [
+            assets.acquire_surface(os.path.join(directory, sheet)) for sheet in index['sheets']
+        ]
+        # Name -> (sheet, x, y, width, height)
+        self.entries: Dict[str, Tuple[int, int, int, int, int]] = {
+            name: tuple(entry) for name, entry in index['entries'].items()
+        }
+        # Folder -> texture names in the order import_folder gives them
+        self.folders: Dict[str, List[str]] = index['folders']
+        self.textures: Dict[str, pygame.Surface] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def get(self, name: str) -> pygame.Surface:
+        """Get a texture as a subsurface of its sheet."""
+        texture = self.textures.get(name)
+        if texture is None:
+            sheet, x, y, width, height = self.entries[name]
+            texture = self.sheets[sheet].subsurface((x, y, width, height))
+            self.textures[name] = texture
+        return texture
+
+    def get_folder(self, folder: str) -> Optional[List[pygame.Surface]]:
+        """Get the textures of a folder like import_folder does, None if the folder was not packed."""
+        names = self.folders.get(folder)
+        if names is None:
+            return None
+        return [self.get(name) for name in names]
+
+
+def is_atlas_current(index: Dict) -> bool:
+    """Check that none of the packed source files changed since the atlas was built."""
+    for path, modified in index['sources'].items():
+        if not os.path.exists(path) or os.path.getmtime(path) > modified:
+            return False
+    return True
+
+
+_atlas: Optional[TextureAtlas] = None
+_atlas_loaded = False
+
+
+def get_atlas() -> Optional[TextureAtlas]:
+    """
+    Get the packed texture atlas, loading it on first use.
+    Returns None if it was not built or is out of date, callers then load the separate files.
+    """
+    global _atlas, _atlas_loaded
+    if _atlas_loaded:
+        return _atlas
+    _atlas_loaded = True
+
+    if not os.path.exists(ATLAS_INDEX):
+        return None
+    with open(ATLAS_INDEX) as file:
+        index = json.load(file)
+    if index.get('version') != ATLAS_VERSION or not is_atlas_current(index):
+        print(f"Warning: {ATLAS_INDEX} is out of date, loading separate textures. "
+              f"Rebuild it with: py src/processor/asset_postprocessor.py")
+        return None
+    _atlas = TextureAtlas(index)
+    return _atlas
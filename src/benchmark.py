@@ -0,0 +1,282 @@
+"""
+Headless benchmark of world streaming and rendering.
+
+Walks the player along scripted paths with SDL's dummy video driver and a fixed seed,
+then writes frame times, chunk generation times, sprite counts and memory to a JSON
+file under target/ so runs can be compared. Exits with 1 if the first frame after a zoom
+step spends longer than --zoom-budget-ms scaling textures that should have been warmed.
+
+Run from the project root:
+    py src/benchmark.py
+    py src/benchmark.py --scenarios line circle --frames 600 --output target/before.json
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import pygame
+from datetime import datetime
+from typing import Callable, Dict, List
+from settings import *
+from level import Level, SEED
+from scheduler import scheduler
+from texture_cache import scaled_textures
+from materials import material_variants
+from assets import assets
+from utils.debug import DebugOverlay
+from utils.profiler import profiler
+
+try:
+    import resource  # Peak memory of the process, not available on Windows
+except ImportError:
+    resource = None
+
+
+class BenchmarkGame:
+    """
+    Stands in for Game without the event loop, the level only needs the screen, clock and debug overlay.
+    """
+    def __init__(self, seed: int, save_directory: str):
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.clock = pygame.time.Clock()
+        self.debug = DebugOverlay(game=self)
+        self.debug.enabled = False
+        self.level = Level(game=self, seed=seed, save_directory=save_directory)
+
+
+# Scripted paths, each takes the frame index and the level and moves the player or camera
+def walk_line(frame: int, level: Level):
+    """Walk diagonally across the map, crossing a chunk every few dozen frames."""
+    level.player.pos += pygame.math.Vector2(15, 9)
+
+
+def walk_circle(frame: int, level: Level, radius: float = 1500, frames_per_turn: int = 240):
+    """Walk a circle around the start, loading chunks on every side."""
+    angle = 2 * math.pi * frame / frames_per_turn
+    next_angle = 2 * math.pi * (frame + 1) / frames_per_turn
+    level.player.pos += pygame.math.Vector2(
+        radius * (math.cos(next_angle) - math.cos(angle)),
+        radius * (math.sin(next_angle) - math.sin(angle))
+    )
+
+
+def sweep_zoom(frame: int, level: Level, frames_per_level: int = 4):
+    """Stand still and step the zoom from the lowest to the highest level and back."""
+    steps = len(ZOOM_LEVELS) - 1
+    step = (frame // frames_per_level) % (2 * steps)
+    level.all_sprites.set_zoom(ZOOM_LEVELS[step if step <= steps else 2 * steps - step])
+
+
+def step_zoom(frame: int, level: Level, frames_per_step: int = 30):
+    """
+    Step the zoom every quarter second, down to the lowest level, up to the highest and back,
+    so the next levels have time to warm between steps.
+    """
+    if frame % frames_per_step:
+        return
+    start = ZOOM_LEVELS.index(1.0)
+    cycle = list(range(start, 0, -1)) + list(range(len(ZOOM_LEVELS) - 1)) + list(range(len(ZOOM_LEVELS) - 1, start, -1))
+    level.all_sprites.set_zoom(ZOOM_LEVELS[cycle[(frame // frames_per_step) % len(cycle)]])
+
+
+def stand_still(frame: int, level: Level):
+    """Do nothing, only the player animation changes."""
+
+
+SCENARIOS: Dict[str, Callable[[int, Level], None]] = {
+    'line': walk_line,
+    'circle': walk_circle,
+    'zoom_sweep': sweep_zoom,
+    'zoom_steps': step_zoom,
+    'idle': stand_still,
+}
+
+# Scenarios that give the next zoom levels time to warm between steps, checked against the zoom budget
+WARMED_ZOOM_SCENARIOS = ['zoom_steps']
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Get a percentile of already sorted values."""
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summarize_ms(values: List[float]) -> Dict[str, float]:
+    """Summarize times in seconds as milliseconds."""
+    ordered = sorted(values)
+    if not ordered:
+        return {'count': 0}
+    return {
+        'count': len(ordered),
+        'mean': sum(ordered) / len(ordered) * 1000,
+        'p50': percentile(ordered, 0.5) * 1000,
+        'p95': percentile(ordered, 0.95) * 1000,
+        'p99': percentile(ordered, 0.99) * 1000,
+        'max': ordered[-1] * 1000,
+    }
+
+
+def peak_memory_mb():
+    """Peak resident memory of the process so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+
+
+def reset_shared_state():
+    """Clear the singletons the level fills, so every scenario starts as cold as a new game."""
+    scheduler.clear()
+    scaled_textures.clear()
+    material_variants.clear()
+    assets.clear()
+
+
+async def run_scenario(name: str, frames: int, seed: int) -> Dict:
+    """Run one scripted path on a fresh level, with chunks generated into a temporary directory."""
+    reset_shared_state()
+    # Collect from before the level is made, so the chunks of the first load are timed too
+    history_size = profiler.history_size
+    profiler.enabled = True
+    profiler.reset(history_size=frames)
+
+    save_directory = tempfile.mkdtemp(prefix='moon_lantern_bench_')
+    setup_start = time.perf_counter()
+    game = BenchmarkGame(seed, save_directory)
+    setup_time = time.perf_counter() - setup_start
+    level = game.level
+    chunk_manager = level.world.chunk_manager
+
+    move = SCENARIOS[name]
+    frame_times = []
+    zoom_frame_times = []
+    zoom_scale_times = []
+    sprite_counts = []
+    chunk_counts = []
+    loaded_chunks = set(chunk_manager.chunks)
+    dtime = 1 / FPS
+    for frame in range(frames):
+        zoom = level.all_sprites.zoom
+        move(frame, level)
+        level.player.rect.center = level.player.pos
+
+        # Same steps as Game.run, without waiting for the clock
+        frame_start = time.perf_counter()
+        changed_rects = await level.run(dtime)
+        with profiler.phase('display'):
+            if changed_rects is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(changed_rects)
+        with profiler.phase('scheduler'):
+            await scheduler.run(frame_start + 1 / FPS)
+        frame_times.append(time.perf_counter() - frame_start)
+        if level.all_sprites.zoom != zoom:
+            zoom_frame_times.append(frame_times[-1])
+            zoom_scale_times.append(profiler.current.get('scale', 0.0))
+        profiler.end_frame()
+
+        sprite_counts.append(len(level.all_sprites))
+        chunk_counts.append(len(chunk_manager.chunks))
+        loaded_chunks.update(chunk_manager.chunks)
+
+    phases = {
+        phase: {'mean': average, 'p99': p99}
+        for phase, average, p99 in profiler.get_stats() if phase != 'frame'
+    }
+    result = {
+        'frames': frames,
+        'setup_ms': setup_time * 1000,
+        'frame_ms': summarize_ms(frame_times),
+        # The first frame after each zoom step, and the time it spent scaling what was not warmed
+        'zoom_frame_ms': summarize_ms(zoom_frame_times),
+        'zoom_scale_ms': summarize_ms(zoom_scale_times),
+        'phase_ms': phases,
+        'chunk_generation_ms': summarize_ms(profiler.samples.get('chunk_load', [])),
+        'chunks_visited': len(loaded_chunks),
+        'sprites': {'mean': sum(sprite_counts) / frames, 'max': max(sprite_counts)},
+        'loaded_chunks': {'mean': sum(chunk_counts) / frames, 'max': max(chunk_counts)},
+        'texture_cache_mb': scaled_textures.memory / (1024 * 1024),
+        'peak_memory_mb': peak_memory_mb(),
+    }
+
+    level.world.shutdown()
+    profiler.enabled = False
+    profiler.reset(history_size=history_size)
+    reset_shared_state()
+    shutil.rmtree(save_directory, ignore_errors=True)
+    return result
+
+
+async def run_benchmarks(scenarios: List[str], frames: int, seed: int) -> Dict:
+    results = {}
+    for name in scenarios:
+        results[name] = await run_scenario(name, frames, seed)
+        frame_ms = results[name]['frame_ms']
+        print(f"{name}: p50 {frame_ms['p50']:.2f} ms, p99 {frame_ms['p99']:.2f} ms, "
+              f"max {frame_ms['max']:.2f} ms, {results[name]['chunks_visited']} chunks")
+    return results
+
+
+def check_zoom_budget(results: Dict, budget_ms: float) -> bool:
+    """
+    Check that the first frame after each zoom step scaled for at most budget_ms, in the scenarios
+    that leave the next levels time to warm. Returns True if they all stayed within it.
+    """
+    within_budget = True
+    for name in WARMED_ZOOM_SCENARIOS:
+        if name not in results:
+            continue
+        scale_ms = results[name]['zoom_scale_ms']
+        if scale_ms['count'] and scale_ms['max'] > budget_ms:
+            print(f"{name}: scaling after a zoom step took up to {scale_ms['max']:.2f} ms, "
+                  f"over the budget of {budget_ms:.2f} ms")
+            within_budget = False
+    return within_budget
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless world streaming and rendering benchmark")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--frames', type=int, default=300, help="Frames per scenario")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--output', help="JSON file to write, defaults to target/benchmark_<time>.json")
+    parser.add_argument('--zoom-budget-ms', type=float, default=1000 / FPS,
+                        help="Fail if the first frame after a zoom step scales for longer than this")
+    args = parser.parse_args()
+
+    pygame.init()
+    started = datetime.now()
+    results = asyncio.run(run_benchmarks(args.scenarios, args.frames, args.seed))
+    pygame.quit()
+
+    report = {
+        'started': started.isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'screen': [SCREEN_WIDTH, SCREEN_HEIGHT],
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'scenarios': results,
+    }
+    output = args.output or os.path.join('target', f"benchmark_{started:%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=4)
+    print(f"Results written to {output}")
+    sys.exit(0 if check_zoom_budget(results, args.zoom_budget_ms) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 import pygame
-from support import import_folder
+from registry import registry
 
 class Item(pygame.sprite.Sprite):
     def __init__(self, pos, group, name="item"):
@@ -11,11 +11,16 @@ class Item(pygame.sprite.Sprite):
         self.status = 'down'
         self.frame_index = 0    
 
-    # TODO: Use Maps and Asset Postproccessor!
     def import_assets(self):
-        self.animations = {
-            'up': [], 'down': [], 'left': [], 'right': []
-        }
-        for animation in self.animations.keys():
-            full_path = f'assets/items/{self.name}/{animation}'
-            self.animations[animation] = import_folder(full_path)
\ No newline at end of file
+        # Loaded once per item name and shared by all instances
+        self.animations = registry.get_item_animations(self.name)
+        self.assets_released = False
+        self.record = registry.items.get(self.name)
+        self.model_surface = registry.get_item_surface(self.name)
+
+    def kill(self):
+        # Give the shared frames back, they are freed once no item uses them
+        if not self.assets_released:
+            registry.release_item_animations(self.name)
+            self.assets_released = True
+        super().kill()
@@ -1,44 +1,64 @@
 import pygame
 import asyncio
+import math
+import numpy as np
 from settings import *
 from player import Player
 from sprites import Generic
 from world.world import World
+from render import RenderList, merge_rects
+from texture_cache import scaled_textures
+from utils.profiler import profiler
+from materials import material_variants
+from registry import registry
 
 SEED = 37
 
 class Level:
-    def __init__(self, game):
+    def __init__(self, game, seed=SEED, save_directory=SAVE_DIRECTORY):
         self.display_surface = pygame.display.get_surface()
         # Sprite Groups
         self.all_sprites = CameraGroup()
         # Setup
         self.game = game
-        self.setup(SEED)
+        self.setup(seed, save_directory)
 
-    def setup(self, seed=SEED):
+    def setup(self, seed=SEED, save_directory=SAVE_DIRECTORY):
         self.current_layer = LAYERS['ground']
+        # Item and model definitions
+        registry.load()
         # Create the procedural world first so we can position the player on it
-        self.world = World(self.all_sprites, seed=seed)
+        self.world = World(self.all_sprites, seed=seed, save_directory=save_directory)
         
         # Create the player at a good starting position
         self.player = Player((640, 360), self.all_sprites)
         
+        # Recolor the material variants the models use in the first frames' spare time
+        material_variants.queue_warm(registry.get_mapped_variants())
+        
         # Set initial chunk loading based on player position
-        self.world.update(self.player.rect.center)
+        # Wait for the first chunks so the world is not empty on the first frame
+        self.world.update(self.player.rect.center, wait=True)
     
 
     async def run(self, dtime):
-        # Basic bg
-        self.display_surface.fill("black")
+        """
+        Runs one frame and returns the screen rects that changed, or None if all of it did.
+        """
         # Update the world based on player position
         player_center_world = pygame.math.Vector2(self.player.rect.center)  # Player center in world coords
-        self.world.update(player_center_world)
-        # Draw all sprites
-        await self.all_sprites.custom_draw(self.player)
-        self.all_sprites.update(dtime)
+        with profiler.phase('world'):
+            self.world.update(player_center_world)
+        # Draw all sprites (the camera clears the background), redrawing under the old debug text
+        changed_rects = await self.all_sprites.custom_draw(self.player, self.game.debug.drawn_rects)
+        with profiler.phase('update'):
+            self.all_sprites.update(dtime)
         # Debug
-        self.game.debug.draw(self.world, self.player, self.all_sprites)
+        with profiler.phase('debug'):
+            debug_rects = self.game.debug.draw(self.world, self.player, self.all_sprites)
+        if changed_rects is None:
+            return None
+        return changed_rects + debug_rects
 
 
 class CameraGroup(pygame.sprite.Group):
@@ -50,23 +70,81 @@ class CameraGroup(pygame.sprite.Group):
         self.zoom = 1.0 
         self.min_zoom = 0.5
         self.max_zoom = 4.0
-        # Cache for scaled images
-        self.scaled_cache = {}
+        # Cache for scaled images, shared with the asset owners that register textures
+        self.scaled_textures = scaled_textures
+        # Only redraw the areas that changed while the camera stands still
+        self.dirty_rects_enabled = True
+        self.last_frame_state = None
+        self.last_dynamic_rects = []
         # Track visible sprites for optimization
         self.visible_sprites = []
+        # Scaled visible parts of sprites larger than the screen, made for the whole screen
+        # so partial redraws line up with full ones, kept until the next full redraw
+        self.visible_parts = {}
+        # Sprites kept in draw order as they are added and removed
+        self.render_list = RenderList()
         
         
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.render_list.add(sprite)
+    
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.render_list.remove(sprite)
+        
     def set_zoom(self, zoom_value): 
-        self.zoom = max(self.min_zoom, min(self.max_zoom, zoom_value))
-        # Clear the image cache when zooming
-        self.scaled_cache.clear()
+        zoom_value = max(self.min_zoom, min(self.max_zoom, zoom_value))
+        # Snap to the nearest zoom level so scaled textures can be reused
+        level = min(range(len(ZOOM_LEVELS)), key=lambda index: abs(ZOOM_LEVELS[index] - zoom_value))
+        view_center = (self.offset + pygame.math.Vector2(self.display_surface.get_size()) / 2) / self.zoom
+        self.zoom = ZOOM_LEVELS[level]
         
+        # Scale the textures in view for the zoom steps on either side, in the time frames have left
+        warm_keys = {
+            ZOOM_LEVELS[index]: self._texture_keys_in_view(view_center, ZOOM_LEVELS[index])
+            for index in (level - 1, level, level + 1) if 0 <= index < len(ZOOM_LEVELS)
+        }
+        self.scaled_textures.queue_warm(warm_keys, self.zoom, self.display_surface.get_size())
+    
+    def _texture_keys_in_view(self, view_center, zoom):
+        """Texture keys of the sprites in view around view_center at zoom, nearest to the middle first."""
+        screen_width, screen_height = self.display_surface.get_size()
+        view_rect = pygame.Rect(0, 0, math.ceil(screen_width / zoom), math.ceil(screen_height / zoom))
+        view_rect.center = view_center
+        sprites = [
+            sprite for sprite in self.render_list.visible(view_rect)
+            if getattr(sprite, 'texture_key', None) and sprite.rect.colliderect(view_rect)
+        ]
+        sprites.sort(key=lambda sprite: view_center.distance_squared_to(sprite.rect.center))
+        return [sprite.texture_key for sprite in sprites]
+        
+    def screen_to_world(self, screen_x, screen_y):
+        """
+        Convert screen coordinates to unzoomed world pixels, as drawn in the last frame.
+        Takes numbers or numpy arrays.
+        """
+        return (screen_x + self.offset.x) / self.zoom, (screen_y + self.offset.y) / self.zoom
+    
+    def redraw(self):
+        """Redraw the whole screen on the next draw."""
+        self.last_frame_state = None
+    
+    def toggle_dirty_rects(self):
+        """Toggle redrawing only the changed areas of the screen"""
+        self.dirty_rects_enabled = not self.dirty_rects_enabled
+        self.redraw()
+    
     # Drawing to the screen
-    async def custom_draw(self, player):
+    async def custom_draw(self, player, dirty_areas=()):
         """
             Draws all sprites relative to the player's position, 
             ensuring the player stays centered on screen when zooming.
             Only visible sprites will be rendered.
+            
+            While the camera and the static sprites stay the same, only the areas
+            of dynamic sprites and dirty_areas (screen rects) are redrawn.
+            Returns the screen rects that changed, or None when the whole screen was redrawn.
         """
         # Compute the 'zoomed' center of the player in world space 
         # (i.e., player world position * zoom).
@@ -85,39 +163,138 @@ class CameraGroup(pygame.sprite.Group):
         # Screen rect for culling
         screen_rect = self.display_surface.get_rect()
         
-        # Sort sprites by their z-layer for proper drawing order
+        # Anything that moves every static sprite on screen, or changes one, needs a full redraw
+        frame_state = (
+            self.offset.x, self.offset.y, self.zoom,
+            self.render_list.revision, self.scaled_textures.revision
+        )
+        dynamic_rects = [self._get_screen_rect(sprite) for sprite in self.render_list.dynamic]
+        
+        if not self.dirty_rects_enabled or frame_state != self.last_frame_state:
+            self.visible_parts.clear()
+            self.display_surface.fill("black")
+            self._draw_area(screen_rect)
+            changed_rects = None
+        else:
+            # Erase the dynamic sprites where they were, draw them where they are now
+            areas = merge_rects(self.last_dynamic_rects + dynamic_rects + list(dirty_areas))
+            changed_rects = []
+            for area in areas:
+                area = area.clip(screen_rect)
+                if not area:
+                    continue
+                self.display_surface.set_clip(area)
+                self.display_surface.fill("black", area)
+                self._draw_area(area)
+                changed_rects.append(area)
+            self.display_surface.set_clip(None)
+        
+        self.last_frame_state = frame_state
+        self.last_dynamic_rects = dynamic_rects
+        return changed_rects
+    
+    def _get_screen_rect(self, sprite):
+        """Where a sprite is drawn on screen at the current offset and zoom."""
+        final_pos = pygame.math.Vector2(sprite.rect.topleft) * self.zoom - self.offset
+        width = int(sprite.rect.width * self.zoom)
+        height = int(sprite.rect.height * self.zoom)
+        return pygame.Rect(final_pos, (width, height))
+    
+    def _draw_area(self, area):
+        """
+            Draws the sprites that overlap area (a screen rect) back to front.
+        """
+        screen_rect = self.display_surface.get_rect()
+        
+        # The part of the world under the area, in unzoomed world pixels
+        view_rect = pygame.Rect(
+            math.floor((self.offset.x + area.x) / self.zoom),
+            math.floor((self.offset.y + area.y) / self.zoom),
+            math.ceil(area.width / self.zoom) + 1,
+            math.ceil(area.height / self.zoom) + 1
+        )
+        
+        # The render list keeps sprites ordered by their z-layer and only gives the ones near the view
         # This ensures tiles are drawn from back to front
-        for sprite in sorted(self.sprites(), key=lambda sprite: sprite.zlayer):
+        with profiler.phase('sort'):
             # Skip empty tile containers (they won't have images)
-            if not hasattr(sprite, 'image') or sprite.image is None:
-                continue
-            
-            # Get the sprite world pos, then convert/zoom it
-            sprite_center_world = pygame.math.Vector2(sprite.rect.topleft)
-            sprite_pos_zoomed = sprite_center_world * self.zoom
-            final_pos = sprite_pos_zoomed - self.offset
-            
-            # Scale the sprite image by the zoom (with caching)
-            width = int(sprite.rect.width * self.zoom)
-            height = int(sprite.rect.height * self.zoom)
-            if width <= 0 or height <= 0:
-                continue  # Avoid scaling to negative or zero
-            
-            # Use cached scaled image if available
-            cache_key = (id(sprite.image), width, height)
-            if cache_key in self.scaled_cache:
-                scaled_image = self.scaled_cache[cache_key]
-            else:
-                scaled_image = pygame.transform.scale(sprite.image, (width, height))
-                # Cache the scaled image for future use
-                self.scaled_cache[cache_key] = scaled_image
+            sprites = [
+                sprite for sprite in self.render_list.visible(view_rect)
+                if getattr(sprite, 'image', None) is not None
+            ]
+        if not sprites:
+            return
+        
+        # Screen rects of all sprites at once, truncated like pygame.Rect does with floats
+        rects = np.array([sprite.rect for sprite in sprites], dtype=np.float64)
+        lefts = (rects[:, 0] * self.zoom - self.offset.x).astype(np.int64)
+        tops = (rects[:, 1] * self.zoom - self.offset.y).astype(np.int64)
+        widths = (rects[:, 2] * self.zoom).astype(np.int64)
+        heights = (rects[:, 3] * self.zoom).astype(np.int64)
+        # Skip sprites scaled to nothing or outside the area, before paying for any scaling
+        shown = np.flatnonzero(
+            (widths > 0) & (heights > 0) &
+            (lefts < area.right) & (lefts + widths > area.left) &
+            (tops < area.bottom) & (tops + heights > area.top)
+        )
+        
+        # Everything is collected in draw order and blitted in one call
+        blit_sequence = []
+        for index, left, top, width, height in zip(
+            shown.tolist(), lefts[shown].tolist(), tops[shown].tolist(),
+            widths[shown].tolist(), heights[shown].tolist()
+        ):
+            sprite = sprites[index]
             
-            # Adjust rect for positioning
-            scaled_rect = scaled_image.get_rect(topleft=final_pos)
+            # No scaling needed at the default zoom
+            if (width, height) == sprite.image.get_size():
+                blit_sequence.append((sprite.image, (left, top)))
+                continue
             
-            # Skip rendering if sprite is outside the screen
-            if not screen_rect.colliderect(scaled_rect):
+            # Sprites larger than the screen (baked chunks when zoomed in) would make huge
+            # scaled copies, so only the part that is on screen gets scaled, the clip keeps it to the area
+            if width > screen_rect.width or height > screen_rect.height:
+                if sprite not in self.visible_parts:
+                    self.visible_parts[sprite] = self._scale_visible_part(
+                        sprite.image, pygame.Rect(left, top, width, height), screen_rect
+                    )
+                part = self.visible_parts[sprite]
+                if part:
+                    blit_sequence.append(part)
                 continue
             
-            # Display the sprite
-            self.display_surface.blit(scaled_image, scaled_rect)
\ No newline at end of file
+            # Use cached scaled image if available, sprites without a texture key use their image
+            texture_key = getattr(sprite, 'texture_key', None) or ('surface', id(sprite.image))
+            with profiler.phase('scale'):
+                scaled_image = self.scaled_textures.get(texture_key, sprite.image, (width, height))
+            blit_sequence.append((scaled_image, (left, top)))
+        
+        # Display the sprites
+        with profiler.phase('blit'):
+            self.display_surface.blits(blit_sequence, doreturn=False)
+    
+    def _scale_visible_part(self, image, scaled_rect, screen_rect):
+        """
+            Scales only the part of image that lands on the screen.
+            scaled_rect is where the whole image would be drawn at the current zoom.
+            Returns the scaled part and where to draw it, or None if nothing is visible.
+        """
+        visible_rect = scaled_rect.clip(screen_rect)
+        # Source pixels covering the visible rect, rounded outwards to whole pixels
+        src_left = int((visible_rect.left - scaled_rect.left) / self.zoom)
+        src_top = int((visible_rect.top - scaled_rect.top) / self.zoom)
+        src_right = min(image.get_width(), math.ceil((visible_rect.right - scaled_rect.left) / self.zoom))
+        src_bottom = min(image.get_height(), math.ceil((visible_rect.bottom - scaled_rect.top) / self.zoom))
+        if src_right <= src_left or src_bottom <= src_top:
+            return None
+        
+        # Scale the source part so its pixels line up with the full scaled image
+        dest_left = scaled_rect.left + int(src_left * self.zoom)
+        dest_top = scaled_rect.top + int(src_top * self.zoom)
+        dest_width = scaled_rect.left + int(src_right * self.zoom) - dest_left
+        dest_height = scaled_rect.top + int(src_bottom * self.zoom) - dest_top
+        part = image.subsurface((src_left, src_top, src_right - src_left, src_bottom - src_top))
+        # Timed apart from 'scale', parts are scaled again on every redraw and can not be warmed
+        with profiler.phase('crop'):
+            scaled_part = pygame.transform.scale(part, (dest_width, dest_height))
+        return scaled_part, (dest_left, dest_top)
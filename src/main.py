@@ -1,9 +1,12 @@
 import pygame
 import sys
+import time
 import asyncio
 from settings import *
 from level import Level
 from utils.debug import DebugOverlay
+from scheduler import scheduler
+from utils.profiler import profiler
 
 FPS_ON = True
 
@@ -22,6 +25,7 @@ class Game:
             for event in pygame.event.get():
                 # Quitting
                 if event.type == pygame.QUIT:
+                    self.level.world.shutdown()
                     pygame.quit()
                     sys.exit()
 
@@ -41,11 +45,25 @@ class Game:
                         self.debug.toggle()
                     if event.key == pygame.K_F4:
                         self.debug.toggle_chunk_borders()
+                    if event.key == pygame.K_F5:
+                        self.debug.toggle_profiler()
+                    if event.key == pygame.K_F6:
+                        self.level.all_sprites.toggle_dirty_rects()
                 
             # Frame timer
             dtime = self.clock.tick(FPS) / 1000
-            await self.level.run(dtime)
-            pygame.display.update()
+            frame_start = time.perf_counter()
+            changed_rects = await self.level.run(dtime)
+            # Only push the changed parts of the screen when the level reports them
+            with profiler.phase('display'):
+                if changed_rects is None:
+                    pygame.display.update()
+                else:
+                    pygame.display.update(changed_rects)
+            # Deferred work gets the rest of the frame, clock.tick waits out whatever is left after
+            with profiler.phase('scheduler'):
+                await scheduler.run(frame_start + 1 / FPS)
+            profiler.end_frame()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,76 @@
+import os
+import pygame
+from typing import Dict, Generator, Iterable, List, Tuple
+from settings import TASK_PRIORITIES
+from scheduler import scheduler
+from support import import_image, image_to_surface
+from atlas import get_atlas
+from assets import assets
+from processor.atlas_mapper import extract_palette_from_image, map_palette
+
+TEXTURE_DIRECTORY = 'assets/textures'
+PALETTE_DIRECTORY = 'assets/textures/color_map'
+
+
+class MaterialVariantCache:
+    """
+    Textures recolored with a material palette, keyed by (texture, palette) as the models name them,
+    e.g. ('item/axe', 'material/iridium').
+    Each variant is mapped once and kept as a Surface, so drawing one costs a single blit.
+    """
+    def __init__(self):
+        self.variants: Dict[Tuple[str, str], pygame.Surface] = {}
+        # Palettes by path, most variants share the same base palette
+        self.palettes: Dict[str, List[Tuple[int, int, int]]] = {}
+
+    def get(self, texture: str, palette: str) -> pygame.Surface:
+        """Get a texture mapped to a palette, mapping it now if it was not warmed."""
+        key = (texture, palette)
+        variant = self.variants.get(key)
+        if variant is None:
+            # The cache holds the variant for as long as the game runs
+            variant = assets.acquire(('material', texture, palette), lambda: self._map_variant(texture, palette))
+            self.variants[key] = variant
+        return variant
+
+    def clear(self):
+        """Release every mapped variant and forget the palettes."""
+        for texture, palette in self.variants:
+            assets.release(('material', texture, palette))
+        self.variants.clear()
+        self.palettes.clear()
+
+    def _get_palette(self, path: str) -> List[Tuple[int, int, int]]:
+        palette = self.palettes.get(path)
+        if palette is None:
+            palette = extract_palette_from_image(path)
+            self.palettes[path] = palette
+        return palette
+
+    def _map_variant(self, texture: str, palette: str) -> pygame.Surface:
+        """Map a texture from the base palette of its palette folder to the palette."""
+        # Variants of the models are mapped ahead of time into the atlas
+        atlas = get_atlas()
+        if atlas and f'{texture}@{palette}' in atlas:
+            return atlas.get(f'{texture}@{palette}')
+        
+        palette_path = f'{PALETTE_DIRECTORY}/{palette}.png'
+        # Every palette folder has one base palette the textures are drawn with
+        base_palette_path = f'{os.path.dirname(palette_path)}/_atlas_map.png'
+        image = import_image(f'{TEXTURE_DIRECTORY}/{texture}.png')
+        mapped_image = map_palette(image, self._get_palette(base_palette_path), self._get_palette(palette_path))
+        return image_to_surface(mapped_image).convert_alpha()
+
+    def queue_warm(self, keys: Iterable[Tuple[str, str]]):
+        """Map the given (texture, palette) variants in the time frames have left."""
+        scheduler.submit(self._warm(list(keys)), TASK_PRIORITIES['materials'])
+
+    def _warm(self, keys: List[Tuple[str, str]]) -> Generator:
+        """Scheduler task that maps the queued variants, pausing after each one."""
+        for texture, palette in keys:
+            self.get(texture, palette)
+            yield
+
+
+# Shared by everything that draws material variants
+material_variants = MaterialVariantCache()
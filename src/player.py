@@ -5,7 +5,10 @@ from support import *
 from timer import Timer
 from inventory import Inventory
 from item import Item
-from processor.atlas_mapper import *
+from registry import registry
+from texture_cache import scaled_textures
+from atlas import get_atlas
+from assets import assets
 
 
 class Player(pygame.sprite.Sprite):
@@ -13,13 +16,17 @@ class Player(pygame.sprite.Sprite):
         super().__init__(group)
         # Assets
         self._import_assets()
+        # Frames with the held tool drawn on, copies so the shared frames are never drawn into
+        self.tool_frames: Dict[Tuple[str, int], pygame.Surface] = {}
         # Sprite
         self.status: str = 'down_idle'
         self.frame_index: float = 0.0
         # Image
         self.image: pygame.Surface = self.animations[self.status][int(self.frame_index)]
+        self.texture_key: Tuple[Union[str, int], ...] = ('character', self.status, int(self.frame_index))
         self.rect: pygame.Rect = self.image.get_rect(center=pos)
         self.zlayer: int = LAYERS['main']
+        self.dynamic: bool = True  # Moves every frame, so the render list re-sorts it each frame
         # Hitbox
         # self.hitbox = self.rect.copy().inflate()
         # Movement
@@ -41,9 +48,22 @@ class Player(pygame.sprite.Sprite):
             'up': [], 'down': [], 'left': [], 'right': [],
             'up_idle': [], 'down_idle': [], 'left_idle': [], 'right_idle': []
         }
+        atlas = get_atlas()
+        # Frames come from the packed atlas when it was built, the other folders are decoded together
+        unpacked: List[str] = []
         for animation in self.animations.keys():
-            full_path: str = f'assets/textures/character/{animation}'
-            self.animations[animation] = import_folder(full_path)
+            frames = atlas.get_folder(f'character/{animation}') if atlas else None
+            if frames is None:
+                unpacked.append(animation)
+            else:
+                self.animations[animation] = frames
+        folders = assets.acquire_folders([f'assets/textures/character/{animation}' for animation in unpacked])
+        for animation in unpacked:
+            self.animations[animation] = folders[f'assets/textures/character/{animation}']
+        for animation in self.animations.keys():
+            # Frames are registered so their scaled copies are ready before a zoom step
+            for index, frame in enumerate(self.animations[animation]):
+                scaled_textures.register(('character', animation, index), frame)
 
 
     def _setup_inventory(self) -> None:
@@ -64,7 +84,23 @@ class Player(pygame.sprite.Sprite):
         self.frame_index += 4 * dtime
         if self.frame_index >= len(self.animations[self.status]):
             self.frame_index = 0
-        self.image = self.animations[self.status][int(self.frame_index)]
+        index = int(self.frame_index)
+        if self.timers['main_hand'].active:
+            self.image = self._get_tool_frame(self.status, index)
+            self.texture_key = ('character', self.status, index, 'iridum_axe')
+        else:
+            self.image = self.animations[self.status][index]
+            self.texture_key = ('character', self.status, index)
+
+
+    def _get_tool_frame(self, status: str, index: int) -> pygame.Surface:
+        """Get a copy of an animation frame with the main hand tool drawn on it."""
+        frame = self.tool_frames.get((status, index))
+        if frame is None:
+            frame = self.animations[status][index].copy()
+            frame.blit(registry.get_model_surface('iridum_axe'), (0, 0))
+            self.tool_frames[(status, index)] = frame
+        return frame
 
 
     def input(self) -> None:
@@ -99,15 +135,6 @@ class Player(pygame.sprite.Sprite):
         # Idling
         if self.direction.magnitude() == 0:
             self.status = f'{self.status.split("_")[0]}_idle'
-            
-        # Using main hand    
-        if self.timers['main_hand'].active:
-            #self.status = 'axe'
-            full_path: str = f'assets/textures/item/axe.png'
-            axe_img = import_image(full_path)
-            mapped_img = generate_mapped_image(axe_img, "iridium")
-            surface_img = image_to_surface(mapped_img)
-            self.image.blit(surface_img, (0,0))
 
 
     def move(self, dtime: float) -> None:
@@ -1,5 +1,14 @@
 import pygame, sys
+import json
+import os
+if __name__ == '__main__':
+    # Run as a build step from the project root: py src/processor/asset_postprocessor.py
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import Dict, List, Tuple
 from support import *
+from atlas import ATLAS_DIRECTORY, ATLAS_VERSION
+from registry import load_model_records
+from processor.atlas_mapper import extract_palette_from_image, map_palettes
 
 class AssetPostprocessor:
     def __init__(self, rootpath):
@@ -7,18 +16,143 @@ class AssetPostprocessor:
         self.EXTENSION_PNG = '.png'
         self.PIXEL_MAP_SUFFIX = '.map'
         self.SOURCE_PREFIX = 'source.'
+        self.texture_dir = f'{rootpath}/textures'
+        # Folders packed as whole, in the order import_folder loads them
+        self.ATLAS_FOLDERS = ['character']
+        # Folders whose textures are packed one by one
+        self.ATLAS_TEXTURE_DIRS = ['faces', 'item']
 
     def on_postprocess_texture():
         pass
 
     def process_pixel_atlas(self, surface, file_name: str):
         if not file_name.find('_'):
-            return 
-        
+            return
+
         map_name = f'{file_name.split("_")[0]}{self.PIXEL_MAP_SUFFIX}'
 
 
     def find_pixel_map(self):
         pass
 
-    
\ No newline at end of file
+    def collect_atlas_textures(self) -> Tuple[Dict[str, pygame.Surface], Dict[str, List[str]], List[str]]:
+        """
+        Load every texture that goes into the atlas.
+        Returns the textures by name, the texture names of each packed folder, and the source files used.
+        """
+        textures: Dict[str, pygame.Surface] = {}
+        folders: Dict[str, List[str]] = {}
+        sources: List[str] = []
+
+        def add_texture(name: str, path: str):
+            textures[name] = import_surface(path)
+            sources.append(path)
+
+        # Split tile faces and items
+        for texture_dir in self.ATLAS_TEXTURE_DIRS:
+            directory = f'{self.texture_dir}/{texture_dir}'
+            if not os.path.isdir(directory):
+                continue
+            for file_name in sorted(os.listdir(directory)):
+                if file_name.endswith(self.EXTENSION_PNG):
+                    add_texture(f'{texture_dir}/{file_name[:-len(self.EXTENSION_PNG)]}', f'{directory}/{file_name}')
+
+        # Animation folders, e.g. character/down
+        for folder in self.ATLAS_FOLDERS:
+            directory = f'{self.texture_dir}/{folder}'
+            for animation in sorted(os.listdir(directory)):
+                folder_name = f'{folder}/{animation}'
+                folders[folder_name] = []
+                # Same walk as import_folder, so frames keep their index
+                for _, __, file_names in os.walk(f'{directory}/{animation}'):
+                    for file_name in file_names:
+                        name = f'{folder_name}/{os.path.splitext(file_name)[0]}'
+                        add_texture(name, f'{directory}/{animation}/{file_name}')
+                        folders[folder_name].append(name)
+
+        # Material variants used by the models, all palettes of a texture are mapped in one pass
+        model_dir = f'{self.rootpath}/models'
+        palettes_by_texture: Dict[str, List[str]] = {}
+        for model in load_model_records(model_dir).values():
+            if model.type == 'mapped':
+                palettes_by_texture.setdefault(model.texture, []).append(model.map)
+        for file_name in sorted(os.listdir(model_dir)):
+            sources.append(f'{model_dir}/{file_name}')
+        for texture, palettes in palettes_by_texture.items():
+            texture_path = f'{self.texture_dir}/{texture}{self.EXTENSION_PNG}'
+            palette_paths = {palette: f'{self.texture_dir}/color_map/{palette}.png' for palette in palettes}
+            base_palette_paths = {os.path.dirname(path) + '/_atlas_map.png' for path in palette_paths.values()}
+            if len(base_palette_paths) != 1:
+                raise ValueError(f"Palettes of {texture} do not share one base palette: {palettes}")
+            base_palette_path = base_palette_paths.pop()
+            variants = map_palettes(
+                import_image(texture_path),
+                extract_palette_from_image(base_palette_path),
+                {palette: extract_palette_from_image(path) for palette, path in palette_paths.items()}
+            )
+            for palette, image in variants.items():
+                textures[f'{texture}@{palette}'] = image_to_surface(image).convert_alpha()
+            sources.extend([texture_path, base_palette_path, *palette_paths.values()])
+
+        return textures, folders, sources
+
+    def pack_atlas(self, output_dir: str = ATLAS_DIRECTORY, max_size: int = 2048, padding: int = 1) -> Dict:
+        """
+        Pack the atlas textures into sheets of at most max_size pixels a side, in rows of
+        similar height, and write the sheets and their JSON index to output_dir.
+        """
+        textures, folders, sources = self.collect_atlas_textures()
+
+        # Tallest first so every row wastes little height
+        order = sorted(textures, key=lambda name: (-textures[name].get_height(), -textures[name].get_width(), name))
+        placements: Dict[str, List[int]] = {}
+        sheet_sizes: List[List[int]] = []
+        sheet, x, y, row_height = 0, 0, 0, 0
+        for name in order:
+            width, height = textures[name].get_size()
+            if width > max_size or height > max_size:
+                raise ValueError(f"Texture {name} ({width}x{height}) does not fit in a {max_size} sheet")
+            # Next row, or next sheet once the rows fill this one
+            if x + width > max_size:
+                x, y, row_height = 0, y + row_height + padding, 0
+            if y + height > max_size:
+                sheet, x, y, row_height = sheet + 1, 0, 0, 0
+            if sheet == len(sheet_sizes):
+                sheet_sizes.append([0, 0])
+            placements[name] = [sheet, x, y, width, height]
+            sheet_sizes[sheet][0] = max(sheet_sizes[sheet][0], x + width)
+            sheet_sizes[sheet][1] = max(sheet_sizes[sheet][1], y + height)
+            x += width + padding
+            row_height = max(row_height, height)
+
+        # Draw and save the sheets
+        os.makedirs(output_dir, exist_ok=True)
+        sheets = [pygame.Surface(size, pygame.SRCALPHA) for size in sheet_sizes]
+        for name, (sheet, x, y, _, __) in placements.items():
+            # Copy the pixels as they are, blending onto the empty sheet would darken soft edges
+            sheets[sheet].blit(textures[name], (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        sheet_names = []
+        for index, surface in enumerate(sheets):
+            sheet_name = f'atlas_{index}.png'
+            pygame.image.save(surface, os.path.join(output_dir, sheet_name))
+            sheet_names.append(sheet_name)
+
+        atlas_index = {
+            'version': ATLAS_VERSION,
+            'sheets': sheet_names,
+            'entries': placements,
+            'folders': folders,
+            'sources': {path: os.path.getmtime(path) for path in sources},
+        }
+        with open(os.path.join(output_dir, 'index.json'), 'w') as file:
+            json.dump(atlas_index, file, indent=4)
+        print(f"Packed {len(placements)} textures into {len(sheet_names)} sheet(s) in {output_dir}")
+        return atlas_index
+
+
+if __name__ == '__main__':
+    pygame.init()
+    # Textures are converted like the game loads them, which needs a display
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    AssetPostprocessor('assets').pack_atlas()
+    pygame.quit()
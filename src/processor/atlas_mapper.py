@@ -1,3 +1,4 @@
+import numpy as np
 from PIL import Image
 from typing import List, Tuple, Dict
 
@@ -10,14 +11,65 @@ def extract_palette_from_image(palette_image_path: str) -> List[Tuple[int, int,
     :return: List of RGB tuples representing the palette.
     """
     palette_image = Image.open(palette_image_path).convert("RGBA")
-    palette_pixels = palette_image.getdata()
-    
-    # Get unique colors in the image, keeping their order
-    unique_colors = []
-    for color in palette_pixels:
-        if color not in unique_colors:
-            unique_colors.append(color[:3])  # Exclude alpha channel if present
-    return unique_colors
+    # Every pixel in order, palettes are matched to each other by position
+    palette_pixels = np.asarray(palette_image)[..., :3].reshape(-1, 3)  # Exclude alpha channel
+    return [tuple(color) for color in palette_pixels.tolist()]
+
+
+def _pack_rgba(pixels: np.ndarray) -> np.ndarray:
+    """Pack an (..., 4) uint8 RGBA array into one uint32 per pixel."""
+    return np.ascontiguousarray(pixels, dtype=np.uint8).view(np.uint32)[..., 0]
+
+
+def _pack_palette(palette: List[Tuple[int, int, int]]) -> np.ndarray:
+    """Pack a palette as opaque RGBA colors, one uint32 per color."""
+    colors = np.full((len(palette), 4), 255, dtype=np.uint8)
+    if palette:
+        colors[:, :3] = np.asarray(palette, dtype=np.uint8)
+    return _pack_rgba(colors)
+
+
+def map_palettes(
+    image: Image.Image,
+    base_palette: List[Tuple[int, int, int]],
+    palettes: Dict[str, List[Tuple[int, int, int]]]
+) -> Dict[str, Image.Image]:
+    """
+    Maps the base palette of an image to several target palettes at once.
+    The pixels are looked up in the base palette once, every variant then only
+    gathers its colors from that lookup.
+    Only fully opaque pixels in the base palette are replaced, like map_palette.
+
+    :param image: Input PIL Image with the base grayscale palette.
+    :param base_palette: List of RGB tuples representing the base grayscale palette.
+    :param palettes: A dictionary where keys are palette names, and values are target palettes.
+    :return: A dictionary of palette names to the corresponding PIL Image variants.
+    """
+    for palette in palettes.values():
+        if len(base_palette) != len(palette):
+            raise ValueError("Base and target palettes must have the same number of colors.")
+
+    pixels = _pack_rgba(np.asarray(image.convert("RGBA")))
+
+    # Sorted lookup table of the base colors, a repeated color maps to its last target like a dict would
+    base_colors = _pack_palette(base_palette)
+    reversed_colors = base_colors[::-1]
+    keys, first_reversed = np.unique(reversed_colors, return_index=True)
+    key_positions = len(base_colors) - 1 - first_reversed
+
+    # Position of every pixel's color in the base palette, and whether it is in it at all
+    variants = {}
+    if len(keys):
+        lookup = np.searchsorted(keys, pixels).clip(max=len(keys) - 1)
+        in_palette = keys[lookup] == pixels
+        palette_index = key_positions[lookup]
+    for name, palette in palettes.items():
+        mapped = pixels
+        if len(keys):
+            mapped = np.where(in_palette, _pack_palette(palette)[palette_index], pixels)
+        rgba = mapped.view(np.uint8).reshape(*mapped.shape, 4)
+        variants[name] = Image.fromarray(rgba, "RGBA")
+    return variants
 
 
 def map_palette(
@@ -37,25 +89,7 @@ def map_palette(
     if len(base_palette) != len(target_palette):
         raise ValueError("Base and target palettes must have the same number of colors.")
 
-    # Convert the image to RGBA mode to manipulate pixel data
-    image = image.convert("RGBA")
-    pixels = image.load()
-
-    # Create a mapping dictionary from base palette to target palette
-    color_map: Dict[Tuple[int, int, int, int], Tuple[int, int, int, int]] = {
-        (*base_color, 255): (*target_color, 255)
-        for base_color, target_color in zip(base_palette, target_palette)
-    }
-
-    # Replace colors in the image
-    for y in range(image.height):
-        for x in range(image.width):
-            r, g, b, a = pixels[x, y]
-            current_color = pixels[x, y]
-            if current_color in color_map:
-                pixels[x, y] = color_map[current_color]
-
-    return image
+    return map_palettes(image, base_palette, {'target': target_palette})['target']
 
 
 def generate_atlas_variants(
@@ -72,11 +106,7 @@ def generate_atlas_variants(
     :return: A dictionary of palette names to the corresponding PIL Image variants.
     """
     base_image = Image.open(image_path)
-    variants = {
-        name: map_palette(base_image.copy(), base_palette, palette)
-        for name, palette in palettes.items()
-    }
-    return variants
+    return map_palettes(base_image, base_palette, palettes)
 
 
 def generate_mapped_image(image: Image.Image, palette: str) -> Image.Image:
@@ -0,0 +1,77 @@
+"""
+Check that redrawing only the dirty areas gives the same screen as a full redraw.
+
+Stands still at a number of zoom levels, fractional ones included, with SDL's dummy video
+driver and a fixed seed. After a few frames that only redraw the areas of moving sprites,
+the screen is compared with a full redraw of the same frame.
+
+Run from the project root:
+    py src/redraw_check.py
+    py src/redraw_check.py --zooms 1.7 3.3 --frames 20
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+import numpy as np
+import pygame
+from typing import List
+from settings import *
+from benchmark import BenchmarkGame, reset_shared_state
+from level import SEED
+from scheduler import scheduler
+
+# Default zoom, the lowest and highest, and fractional levels where scaled sprites do not land on whole pixels
+CHECK_ZOOMS = [1.0, 0.5, 0.7, 1.3, 1.7, 2.5, 3.3, 3.7, 4.0]
+
+
+async def check_zoom(game: BenchmarkGame, zoom: float, frames: int) -> int:
+    """Draw frames at zoom standing still, then count the pixels that differ from a full redraw."""
+    level = game.level
+    camera = level.all_sprites
+    camera.set_zoom(zoom)
+    dtime = 1 / FPS
+    for frame in range(frames):
+        await level.run(dtime)
+        await scheduler.run(0)
+    # Sprites update after they are drawn, so both compared frames are drawn without time passing
+    await level.run(0)
+    partial = pygame.surfarray.array3d(game.screen)
+
+    camera.redraw()
+    await level.run(0)
+    full = pygame.surfarray.array3d(game.screen)
+    return int(np.any(partial != full, axis=2).sum())
+
+
+async def run_checks(zooms: List[float], frames: int, seed: int) -> bool:
+    save_directory = tempfile.mkdtemp(prefix='moon_lantern_redraw_')
+    game = BenchmarkGame(seed, save_directory)
+    matched = True
+    for zoom in zooms:
+        different = await check_zoom(game, zoom, frames)
+        print(f"zoom {game.level.all_sprites.zoom}: {different} pixels differ from a full redraw")
+        matched = matched and different == 0
+    game.level.world.shutdown()
+    reset_shared_state()
+    shutil.rmtree(save_directory, ignore_errors=True)
+    return matched
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare dirty area redraws with full redraws")
+    parser.add_argument('--zooms', nargs='+', type=float, default=CHECK_ZOOMS)
+    parser.add_argument('--frames', type=int, default=10, help="Frames drawn at each zoom before comparing")
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args()
+
+    pygame.init()
+    matched = asyncio.run(run_checks(args.zooms, args.frames, args.seed))
+    pygame.quit()
+    print("Dirty area redraws match full redraws" if matched else "Dirty area redraws do NOT match full redraws")
+    sys.exit(0 if matched else 1)
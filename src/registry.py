@@ -1,2 +1,135 @@
-from pygame.math import Vector2
+import json
+import os
+import pygame
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from atlas import get_atlas
+from assets import assets
+from materials import material_variants
 
+MODEL_DIRECTORY = 'assets/models'
+ITEM_DATA_PATH = 'common/item_data.json'
+ITEM_DIRECTORY = 'assets/items'
+ITEM_DIRECTIONS = ['up', 'down', 'left', 'right']
+
+
+class ModelRecord(NamedTuple):
+    """
+    A model from assets/models, named after its file.
+    'mapped' models recolor texture with the palette in map, other models use texture as is.
+    """
+    name: str
+    type: str
+    texture: str
+    map: Optional[str]
+
+
+class ItemRecord(NamedTuple):
+    """An item from common/item_data.json, grouped under category (e.g. 'weapon')."""
+    name: str
+    category: str
+    type: str
+    cooldown: int
+    damage: int
+    model: Optional[str]
+
+
+def load_model_records(directory: str = MODEL_DIRECTORY) -> Dict[str, ModelRecord]:
+    """Parse every model definition in directory."""
+    models = {}
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith('.json'):
+            continue
+        with open(os.path.join(directory, file_name)) as file:
+            model = json.load(file)['model']
+        name = os.path.splitext(file_name)[0]
+        models[name] = ModelRecord(name, model.get('type', 'texture'), model['texture'], model.get('map'))
+    return models
+
+
+def load_item_records(path: str = ITEM_DATA_PATH) -> Dict[str, ItemRecord]:
+    """Parse the item definitions, 'weapon_data' entries get the category 'weapon'."""
+    with open(path) as file:
+        item_data = json.load(file)
+    items = {}
+    for group, entries in item_data.items():
+        category = group[:-len('_data')] if group.endswith('_data') else group
+        for name, data in entries.items():
+            items[name] = ItemRecord(
+                name, category, data.get('type', name),
+                data.get('cooldown', 0), data.get('damage', 0), data.get('model')
+            )
+    return items
+
+
+class Registry:
+    """
+    Item and model definitions, parsed once at startup.
+    Model surfaces are not kept here, they are asked for from whoever owns them each time:
+    the material variants for mapped models, the atlas or the asset manager for the rest.
+    Item animations are shared through the asset manager as well.
+    """
+    def __init__(self):
+        self.models: Dict[str, ModelRecord] = {}
+        self.items: Dict[str, ItemRecord] = {}
+        # Paths of the plain model textures the registry holds in the asset manager
+        self.held_textures: Set[str] = set()
+
+    def load(self, model_directory: str = MODEL_DIRECTORY, item_data_path: str = ITEM_DATA_PATH):
+        """Parse all model and item definitions, releasing the textures of the old ones."""
+        self.models = load_model_records(model_directory)
+        self.items = load_item_records(item_data_path)
+        for item in self.items.values():
+            if item.model is not None and item.model not in self.models:
+                print(f"Warning: Item {item.name} uses unknown model {item.model}")
+        for path in self.held_textures:
+            assets.release(('surface', path))
+        self.held_textures.clear()
+
+    def get_model(self, name: str) -> ModelRecord:
+        return self.models[name]
+
+    def get_item(self, name: str) -> ItemRecord:
+        return self.items[name]
+
+    def get_mapped_variants(self) -> List[Tuple[str, str]]:
+        """Get the (texture, palette) of every mapped model."""
+        return [(model.texture, model.map) for model in self.models.values() if model.type == 'mapped']
+
+    def get_model_surface(self, name: str) -> pygame.Surface:
+        """Get the surface of a model from the cache that owns it, mapping or loading it on first use."""
+        model = self.models[name]
+        if model.type == 'mapped':
+            return material_variants.get(model.texture, model.map)
+        atlas = get_atlas()
+        if atlas and model.texture in atlas:
+            return atlas.get(model.texture)
+        path = f'assets/textures/{model.texture}.png'
+        surface = assets.get(('surface', path))
+        # Held once until the models are loaded again, acquired anew if the asset manager was cleared since
+        if surface is None or path not in self.held_textures:
+            surface = assets.acquire_surface(path)
+            self.held_textures.add(path)
+        return surface
+
+    def get_item_surface(self, name: str) -> Optional[pygame.Surface]:
+        """Get the model surface of an item, None if it has no model."""
+        item = self.items.get(name)
+        if item is None or item.model is None:
+            return None
+        return self.get_model_surface(item.model)
+
+    def get_item_animations(self, name: str) -> Dict[str, List[pygame.Surface]]:
+        """Acquire the animation frames of an item, release them with release_item_animations."""
+        folders = assets.acquire_folders(self._item_folders(name))
+        return {direction: frames for direction, frames in zip(ITEM_DIRECTIONS, folders.values())}
+
+    def release_item_animations(self, name: str):
+        assets.release_folders(self._item_folders(name))
+
+    @staticmethod
+    def _item_folders(name: str) -> List[str]:
+        return [f'{ITEM_DIRECTORY}/{name}/{direction}' for direction in ITEM_DIRECTIONS]
+
+
+# Loaded by the level at startup, shared by every item
+registry = Registry()
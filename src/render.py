@@ -0,0 +1,167 @@
+import bisect
+import heapq
+import itertools
+from typing import Dict, Iterator, List, Set, Tuple
+import pygame
+from settings import LAYERS
+
+
+class SpatialGrid:
+    """
+    Buckets sprites by the grid cells their rect overlaps, in unzoomed world pixels.
+    Looking up an area only touches the cells it covers, however many sprites there are.
+    """
+    def __init__(self, cell_size: int = 512):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Set[pygame.sprite.Sprite]] = {}
+        self.sprite_cells: Dict[pygame.sprite.Sprite, List[Tuple[int, int]]] = {}
+
+    def _cells_for(self, rect: pygame.Rect) -> List[Tuple[int, int]]:
+        """Get the cells overlapped by a rect."""
+        first_x = rect.left // self.cell_size
+        first_y = rect.top // self.cell_size
+        last_x = (rect.right - 1) // self.cell_size
+        last_y = (rect.bottom - 1) // self.cell_size
+        return [
+            (cell_x, cell_y)
+            for cell_y in range(first_y, last_y + 1)
+            for cell_x in range(first_x, last_x + 1)
+        ]
+
+    def insert(self, sprite: pygame.sprite.Sprite, rect: pygame.Rect):
+        """Index a sprite by its rect."""
+        cells = self._cells_for(rect)
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(sprite)
+        self.sprite_cells[sprite] = cells
+
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """Drop a sprite from the index."""
+        for cell in self.sprite_cells.pop(sprite, ()):
+            sprites = self.cells[cell]
+            sprites.discard(sprite)
+            if not sprites:
+                del self.cells[cell]
+
+    def query(self, area: pygame.Rect) -> Set[pygame.sprite.Sprite]:
+        """Get the sprites in the cells that overlap area."""
+        found = set()
+        for cell in self._cells_for(area):
+            sprites = self.cells.get(cell)
+            if sprites:
+                found.update(sprites)
+        return found
+
+
+class RenderList:
+    """
+    Keeps sprites ordered by zlayer so the camera does not sort every sprite each frame.
+    Static sprites sit in sorted buckets, one per LAYERS entry, and are only touched
+    when they are added or removed. Sprites with a truthy `dynamic` attribute are
+    re-sorted every frame and merged in.
+    Equal zlayers keep the order the sprites were added in.
+    Static sprites are also indexed by position so only the ones in view need sorting.
+    """
+    def __init__(self):
+        self.layer_values: List[float] = sorted(set(LAYERS.values()))
+        # Sorted (zlayer, order, sprite) entries of the static sprites per layer bucket
+        self.buckets: Dict[float, List[Tuple[float, int, pygame.sprite.Sprite]]] = {
+            value: [] for value in self.layer_values
+        }
+        # Key each static sprite was inserted with, needed to find it again
+        self.static_keys: Dict[pygame.sprite.Sprite, Tuple[float, int]] = {}
+        # Insertion order of the dynamic sprites
+        self.dynamic: Dict[pygame.sprite.Sprite, int] = {}
+        # Sprites get their zlayer after joining their groups, so they are sorted in on the next draw
+        self.pending: Dict[pygame.sprite.Sprite, int] = {}
+        self.counter = itertools.count()
+        # Static sprites by position, they are expected to keep their rect (remove and add them again if not)
+        self.grid = SpatialGrid()
+        # Bumped whenever a sprite is added or removed, the camera redraws everything when it changes
+        self.revision = 0
+
+    def _bucket_for(self, zlayer: float) -> float:
+        """Get the LAYERS value whose bucket holds the given zlayer."""
+        index = bisect.bisect_right(self.layer_values, zlayer) - 1
+        return self.layer_values[max(index, 0)]
+
+    def add(self, sprite: pygame.sprite.Sprite):
+        """Queue a sprite to be sorted into the list."""
+        self.pending[sprite] = next(self.counter)
+        self.revision += 1
+
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """Take a sprite out of the list."""
+        self.revision += 1
+        if self.pending.pop(sprite, None) is not None:
+            return
+        if self.dynamic.pop(sprite, None) is not None:
+            return
+        key = self.static_keys.pop(sprite, None)
+        if key is None:
+            return
+        self.grid.remove(sprite)
+        bucket = self.buckets[self._bucket_for(key[0])]
+        index = bisect.bisect_left(bucket, key)
+        del bucket[index]
+
+    def _flush_pending(self):
+        """Sort the queued sprites into their buckets."""
+        for sprite, order in self.pending.items():
+            if getattr(sprite, 'dynamic', False):
+                self.dynamic[sprite] = order
+                continue
+            key = (sprite.zlayer, order)
+            self.static_keys[sprite] = key
+            bisect.insort(self.buckets[self._bucket_for(sprite.zlayer)], (*key, sprite))
+            self.grid.insert(sprite, sprite.rect)
+        self.pending.clear()
+
+    def __len__(self) -> int:
+        return len(self.pending) + len(self.dynamic) + len(self.static_keys)
+
+    def __iter__(self) -> Iterator[pygame.sprite.Sprite]:
+        """Iterate the sprites back to front."""
+        self._flush_pending()
+        static_entries = itertools.chain.from_iterable(
+            self.buckets[value] for value in self.layer_values
+        )
+        dynamic_entries = sorted(
+            (sprite.zlayer, order, sprite) for sprite, order in self.dynamic.items()
+        )
+        for _, _, sprite in heapq.merge(static_entries, dynamic_entries):
+            yield sprite
+
+    def visible(self, area: pygame.Rect) -> Iterator[pygame.sprite.Sprite]:
+        """
+        Iterate back to front the static sprites indexed near area, and all dynamic sprites.
+        Sprites near the edge of area may still be off screen, callers do the exact check.
+        """
+        self._flush_pending()
+        static_entries = sorted(
+            (*self.static_keys[sprite], sprite) for sprite in self.grid.query(area)
+        )
+        dynamic_entries = sorted(
+            (sprite.zlayer, order, sprite) for sprite, order in self.dynamic.items()
+        )
+        for _, _, sprite in heapq.merge(static_entries, dynamic_entries):
+            yield sprite
+
+
+def merge_rects(rects: List[pygame.Rect]) -> List[pygame.Rect]:
+    """
+    Merge overlapping rects into their union so no screen area is drawn twice.
+    Empty rects are dropped.
+    """
+    merged: List[pygame.Rect] = []
+    for rect in rects:
+        if not rect.width or not rect.height:
+            continue
+        rect = pygame.Rect(rect)
+        # Keep growing the rect until it overlaps nothing that is left
+        overlapping = rect.collidelist(merged)
+        while overlapping != -1:
+            rect.union_ip(merged.pop(overlapping))
+            overlapping = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
@@ -0,0 +1,83 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, Generator, Hashable, List, Optional, Tuple
+
+
+class FrameScheduler:
+    """
+    Runs deferred work in the time a frame has left, on top of the asyncio loop.
+    Work is submitted as generators, every yield is a point where the task can be
+    paused and picked up again in a later frame.
+    Tasks with a lower priority run first, equal priorities run in submit order.
+    Named tasks are only queued once, subsystems that would submit them every frame
+    check is_queued first so no generator is made for nothing.
+    """
+    def __init__(self):
+        # (priority, order, name, task) entries, the first one runs next
+        self.tasks: List[Tuple[int, int, Optional[Hashable], Generator]] = []
+        self.named_tasks: Dict[Hashable, Generator] = {}
+        self.counter = itertools.count()
+
+    def submit(self, task: Generator, priority: int = 0, name: Optional[Hashable] = None) -> bool:
+        """
+        Queue a task. Returns False if a task with the same name is already queued.
+        """
+        if name is not None:
+            if name in self.named_tasks:
+                task.close()
+                return False
+            self.named_tasks[name] = task
+        heapq.heappush(self.tasks, (priority, next(self.counter), name, task))
+        return True
+
+    def cancel(self, name: Hashable):
+        """Drop a queued task by name."""
+        task = self.named_tasks.pop(name, None)
+        if task is None:
+            return
+        self.tasks = [entry for entry in self.tasks if entry[3] is not task]
+        heapq.heapify(self.tasks)
+        task.close()
+
+    def clear(self):
+        """Drop every queued task."""
+        for entry in self.tasks:
+            entry[3].close()
+        self.tasks.clear()
+        self.named_tasks.clear()
+
+    def is_queued(self, name: Hashable) -> bool:
+        """Check if a task with the given name is queued."""
+        return name in self.named_tasks
+
+    def step(self) -> bool:
+        """
+        Run the first task until its next yield. Returns False when no tasks are left.
+        """
+        if not self.tasks:
+            return False
+        priority, order, name, task = self.tasks[0]
+        try:
+            next(task)
+        except StopIteration:
+            heapq.heappop(self.tasks)
+            if name is not None:
+                del self.named_tasks[name]
+        return True
+
+    async def run(self, deadline: float):
+        """
+        Run tasks until deadline (a time.perf_counter value) or until none are left.
+        At least one step runs per call, so queued work moves on even when frames run late.
+        Control goes back to the event loop between steps.
+        """
+        while self.step():
+            if time.perf_counter() >= deadline:
+                break
+            await asyncio.sleep(0)
+
+
+# Shared by the game loop and every subsystem that defers work to it
+scheduler = FrameScheduler()
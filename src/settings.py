@@ -6,9 +6,23 @@ SCREEN_HEIGHT= 1080
 TILE_SIZE = 64
 _ASSET_SIZE = 16 # A 16x16 is the standard size
 
+# Generated chunks are stored per seed under this directory
+SAVE_DIRECTORY = 'saves'
+
 # Framerate
 FPS = 120
 
+# Zoom steps of the camera, scaled textures are cached per step
+ZOOM_LEVELS = tuple(round(0.5 + 0.1 * step, 1) for step in range(36))  # 0.5 to 4.0
+TEXTURE_CACHE_BYTES = 256 * 1024 * 1024  # Fits the chunks in view at three zoom levels up to 1.4
+
+# Deferred work run in the time left after each frame, lower runs first
+TASK_PRIORITIES = {
+    'chunks': 0,
+    'textures': 1,
+    'materials': 2,
+}
+
 # Overlay 
 OVERLAY_POSITIONS = {
     'tool': (40, SCREEN_HEIGHT - 15),
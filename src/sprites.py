@@ -10,55 +10,22 @@ class Generic(pygame.sprite.Sprite):
         self.rect = self.image.get_rect(topleft=pos)
         self.zlayer = zlayer
 
-class Tile(pygame.sprite.Sprite):
+class ChunkSprite(Generic):
     """
-    A tile in the isometric world that can have up to three visible faces
+    The terrain of a whole chunk baked into a single surface
     """
-    def __init__(self, pos, groups, zlayer=LAYERS['ground'], grid_pos=None, tile_type="red_grass_block"):
-        super().__init__(groups)
+    def __init__(self, chunk_pos, pos, surface, groups, zlayer=LAYERS['ground']):
+        super().__init__(pos, surface, groups, zlayer)
+        self.chunk_pos = chunk_pos  # Chunk coordinates (not tile coordinates)
+        self.texture_key = ('chunk', *chunk_pos)  # Key of its scaled copies in the texture cache
+    
+    def reset(self, chunk_pos, pos, zlayer):
+        """Move a killed sprite to another chunk so it can be added again, keeping its surface."""
         self.pos = pos
-        self.grid_pos = grid_pos  # Store the grid position (col, row)
+        self.rect.topleft = pos
         self.zlayer = zlayer
-        self.groups = groups
-        self.tile_type = tile_type  # Store the type of tile
-        
-        # Store references to the faces of this tile
-        self.faces = {
-            'top': None,
-            'left': None,
-            'right': None
-        }
-        
-        # Create an empty surface for the tile itself
-        # This is used just for collision detection and doesn't get rendered
-        self.image = pygame.Surface((1, 1), pygame.SRCALPHA)
-        self.rect = self.image.get_rect(topleft=pos)
-    
-    def add_face(self, face_type, face_sprite):
-        """Add a face to this tile"""
-        self.faces[face_type] = face_sprite
-
-
-class TileFace(Generic):
-    """
-    A single face of a tile (top, left, or right)
-    """
-    def __init__(self, parent_tile, face_type, pos, surface, groups, zlayer=LAYERS['ground']):
-        super().__init__(pos, surface, groups, zlayer)
-        self.parent_tile = parent_tile  # Reference to the parent tile
-        self.face_type = face_type      # Which face: 'top', 'left', or 'right'
-        
-        # Adjust the drawing order (z-sorting) based on the face type
-        # This ensures proper overlapping of faces
-        z_offset = 0
-        if face_type == 'right':
-            z_offset = 1
-        elif face_type == 'left':
-            z_offset = 2
-        elif face_type == 'top':
-            z_offset = 3
-            
-        self.zlayer = zlayer + z_offset / 10.0  # Small offset to ensure proper ordering
+        self.chunk_pos = chunk_pos
+        self.texture_key = ('chunk', *chunk_pos)
 
 
 class Particle(Generic):
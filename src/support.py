@@ -1,19 +1,106 @@
 import pygame
 import os
 import sys
+import json
+import struct
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import Image
-from typing import Dict, List, Tuple, Union
+from typing import Callable, Dict, List, Tuple, Union
+
+# Image files are decoded in parallel, converting for the display stays on the main thread
+_decode_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="decode")
+
+# Textures that are scaled after loading are kept here as raw RGBA, see import_scaled_surfaces
+SCALED_CACHE_DIR = 'target/cache'
+SCALED_CACHE_MAGIC = b'MLSC'
+_SCALED_CACHE_HEADER = struct.Struct('<4sI')  # Magic, length of the JSON index after it
+
+def import_surfaces(paths: List[str]) -> List[pygame.Surface]:
+    images = list(_decode_pool.map(pygame.image.load, paths))
+    return [image.convert_alpha() for image in images]
+
+def _folder_paths(path: str) -> List[str]:
+    return [f'{path}/{image}' for _, __, img_files in os.walk(path) for image in img_files]
 
 def import_folder(path): 
-    surface_list = []
-    for _, __, img_files in os.walk(path):
-        for image in img_files:
-            full_path = f'{path}/{image}'
-            image_surface = pygame.image.load(full_path).convert_alpha()
-            surface_list.append(image_surface)
-
-    return surface_list
+    return import_surfaces(_folder_paths(path))
+
+def import_folders(paths: List[str]) -> Dict[str, List[pygame.Surface]]:
+    """Like import_folder for several folders, decoding all their files at once."""
+    folder_paths = {path: _folder_paths(path) for path in paths}
+    surfaces = iter(import_surfaces([file for files in folder_paths.values() for file in files]))
+    return {path: [next(surfaces) for _ in files] for path, files in folder_paths.items()}
+
+def import_scaled_surfaces(
+    cache_name: str,
+    paths: Dict[str, str],
+    scale: int,
+    load: Callable[[List[str]], List[pygame.Surface]] = import_surfaces
+) -> Dict[str, pygame.Surface]:
+    """
+    Load image files by name, scaled up by scale.
+    The scaled pixels are stored in target/cache/{cache_name}.bin and read back from there
+    on the next launch, as long as none of the files changed. load decodes the files on a miss.
+    """
+    cache_path = f'{SCALED_CACHE_DIR}/{cache_name}.bin'
+    sources = {}
+    for name, path in paths.items():
+        stat = os.stat(path)
+        sources[name] = [path, stat.st_mtime_ns, stat.st_size]
+
+    scaled = _read_scaled_cache(cache_path, sources, scale)
+    if scaled is not None:
+        return scaled
+
+    surfaces = load(list(paths.values()))
+    scaled = {
+        name: pygame.transform.scale(surface, (surface.get_width() * scale, surface.get_height() * scale))
+        for name, surface in zip(paths, surfaces)
+    }
+    _write_scaled_cache(cache_path, sources, scale, scaled)
+    return scaled
+
+def _read_scaled_cache(cache_path: str, sources: Dict, scale: int) -> Union[Dict[str, pygame.Surface], None]:
+    """Read the surfaces of a scaled cache file, None if it is missing or was made from other files."""
+    if not os.path.exists(cache_path):
+        return None
+    with open(cache_path, 'rb') as file:
+        data = file.read()
+    magic, index_size = _SCALED_CACHE_HEADER.unpack_from(data)
+    if magic != SCALED_CACHE_MAGIC:
+        return None
+    index = json.loads(data[_SCALED_CACHE_HEADER.size:_SCALED_CACHE_HEADER.size + index_size])
+    if index['scale'] != scale or index['sources'] != sources:
+        return None
+
+    pixels = memoryview(data)[_SCALED_CACHE_HEADER.size + index_size:]
+    scaled = {}
+    for name, (offset, width, height) in index['surfaces'].items():
+        buffer = pixels[offset:offset + width * height * 4]
+        # Copy into a display format surface, so nothing keeps the file data alive
+        scaled[name] = pygame.image.frombuffer(buffer, (width, height), 'RGBA').convert_alpha()
+    return scaled
+
+def _write_scaled_cache(cache_path: str, sources: Dict, scale: int, scaled: Dict[str, pygame.Surface]):
+    surfaces = {}
+    chunks = []
+    offset = 0
+    for name, surface in scaled.items():
+        raw = pygame.image.tobytes(surface, 'RGBA')
+        surfaces[name] = [offset, surface.get_width(), surface.get_height()]
+        chunks.append(raw)
+        offset += len(raw)
+    index = json.dumps({'scale': scale, 'sources': sources, 'surfaces': surfaces}).encode()
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # Write next to it and swap, so a crash never leaves half a cache behind
+    with open(cache_path + '.tmp', 'wb') as file:
+        file.write(_SCALED_CACHE_HEADER.pack(SCALED_CACHE_MAGIC, len(index)))
+        file.write(index)
+        for raw in chunks:
+            file.write(raw)
+    os.replace(cache_path + '.tmp', cache_path)
 
 def import_image(path: str) -> Image.Image:
     image = Image.open(path)
@@ -0,0 +1,156 @@
+import itertools
+import pygame
+from collections import OrderedDict
+from typing import Dict, Generator, Hashable, List, Optional, Set, Tuple
+from settings import TEXTURE_CACHE_BYTES, TASK_PRIORITIES
+from scheduler import scheduler
+
+
+class TextureCache:
+    """
+    Scaled copies of textures, looked up by a stable texture key and size.
+    Copies are kept least recently used first and evicted once their pixel memory
+    goes over max_bytes. Registered textures can be scaled ahead of time for the
+    zoom levels next to the current one, in the time frames have left.
+    """
+    def __init__(self, max_bytes: int = TEXTURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.memory = 0
+        # Scaled copies keyed by (texture key, width, height)
+        self.entries: OrderedDict = OrderedDict()
+        self.key_sizes: Dict[Hashable, Set[Tuple[int, int]]] = {}
+        # Source textures that are warmed for upcoming zoom levels
+        self.sources: Dict[Hashable, pygame.Surface] = {}
+        # Bumped whenever a source texture is redrawn
+        self.revision = 0
+        # Entry keys of the queued warm set, warming never evicts these to make room
+        self.warm_set: Set[Tuple] = set()
+
+    def register(self, key: Hashable, surface: pygame.Surface):
+        """Register the source texture of a key so it can be warmed."""
+        if self.sources.get(key) is not surface:
+            self.invalidate(key)
+        self.sources[key] = surface
+
+    def unregister(self, key: Hashable):
+        """Forget a texture and its scaled copies."""
+        self.sources.pop(key, None)
+        self.invalidate(key)
+
+    def invalidate(self, key: Hashable):
+        """Drop the scaled copies of a texture, for when its source was redrawn."""
+        self.revision += 1
+        for width, height in self.key_sizes.pop(key, ()):
+            surface = self.entries.pop((key, width, height))
+            self.memory -= self._surface_bytes(surface)
+
+    def clear(self):
+        """Forget every texture and scaled copy, and stop warming."""
+        scheduler.cancel('warm_textures')
+        self.revision += 1
+        self.entries.clear()
+        self.key_sizes.clear()
+        self.sources.clear()
+        self.warm_set = set()
+        self.memory = 0
+
+    def get(self, key: Hashable, surface: pygame.Surface, size: Tuple[int, int]) -> pygame.Surface:
+        """Get surface scaled to size, from the cache if a copy was made before."""
+        entry_key = (key, *size)
+        scaled = self.entries.get(entry_key)
+        if scaled is not None:
+            self.entries.move_to_end(entry_key)
+            return scaled
+        scaled = pygame.transform.scale(surface, size)
+        self._store(entry_key, scaled)
+        return scaled
+
+    def _store(self, entry_key: Tuple, scaled: pygame.Surface, protected: Set[Tuple] = frozenset()):
+        key, width, height = entry_key
+        self.entries[entry_key] = scaled
+        self.key_sizes.setdefault(key, set()).add((width, height))
+        self.memory += self._surface_bytes(scaled)
+        if self.memory <= self.max_bytes:
+            return
+        # Evict the least recently used copies, but never the one just made or a protected one
+        for old_key in list(self.entries):
+            if self.memory <= self.max_bytes:
+                break
+            if old_key == entry_key or old_key in protected:
+                continue
+            old_surface = self.entries.pop(old_key)
+            old_sizes = self.key_sizes[old_key[0]]
+            old_sizes.discard(old_key[1:])
+            if not old_sizes:
+                del self.key_sizes[old_key[0]]
+            self.memory -= self._surface_bytes(old_surface)
+
+    def queue_warm(self, warm_keys: Dict[float, List[Hashable]], current_zoom: float,
+                   max_size: Optional[Tuple[int, int]] = None):
+        """
+        Queue scaling registered textures for upcoming zoom levels, replacing the previous queue.
+        warm_keys maps zoom levels to the texture keys in view at that level, most wanted first.
+        The keys of current_zoom are not warmed, their copies are counted against max_bytes and
+        the levels are queued in turns until the warmed copies would no longer fit next to them.
+        Unscaled sizes are skipped, as are sizes over max_size, the camera only scales the
+        visible part of those.
+        """
+        scheduler.cancel('warm_textures')
+        budget = self.max_bytes
+        current_sizes = set()
+        for key in warm_keys.get(current_zoom, ()):
+            size = self._scaled_size(key, current_zoom, max_size)
+            if size and (key, *size) not in current_sizes:
+                current_sizes.add((key, *size))
+                budget -= self._size_bytes(key, size)
+        
+        self.warm_set = set()
+        warm_queue: List[Tuple[Hashable, Tuple[int, int]]] = []
+        # Levels take turns, so both zoom directions get the most wanted textures first
+        level_queues = [[(zoom, key) for key in keys] for zoom, keys in warm_keys.items() if zoom != current_zoom]
+        for zoom, key in filter(None, itertools.chain.from_iterable(itertools.zip_longest(*level_queues))):
+            size = self._scaled_size(key, zoom, max_size)
+            if not size or (key, *size) in current_sizes or (key, *size) in self.warm_set:
+                continue
+            size_bytes = self._size_bytes(key, size)
+            if size_bytes > budget:
+                continue
+            budget -= size_bytes
+            self.warm_set.add((key, *size))
+            warm_queue.append((key, size))
+        scheduler.submit(self._warm(warm_queue), TASK_PRIORITIES['textures'], name='warm_textures')
+
+    def _warm(self, warm_queue: List[Tuple[Hashable, Tuple[int, int]]]) -> Generator:
+        """Scheduler task that scales the queued textures, pausing after each one."""
+        for key, size in warm_queue:
+            surface = self.sources.get(key)
+            if surface is None or (key, *size) in self.entries:
+                continue
+            # Warmed copies only push out copies outside the warm set, so they never evict each other
+            self._store((key, *size), pygame.transform.scale(surface, size), protected=self.warm_set)
+            yield
+
+    def _scaled_size(self, key: Hashable, zoom: float,
+                     max_size: Optional[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+        """Size the camera scales a registered texture to at zoom, None if it uses no cached copy for it."""
+        surface = self.sources.get(key)
+        if surface is None:
+            return None
+        width = int(surface.get_width() * zoom)
+        height = int(surface.get_height() * zoom)
+        if width <= 0 or height <= 0 or (width, height) == surface.get_size():
+            return None
+        if max_size and (width > max_size[0] or height > max_size[1]):
+            return None
+        return width, height
+
+    def _size_bytes(self, key: Hashable, size: Tuple[int, int]) -> int:
+        return size[0] * size[1] * self.sources[key].get_bytesize()
+
+    @staticmethod
+    def _surface_bytes(surface: pygame.Surface) -> int:
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+# Shared by the camera and everything that owns textures drawn through it
+scaled_textures = TextureCache()
@@ -1,4 +1,7 @@
 import pygame
+from settings import FPS
+from utils.profiler import profiler
+from assets import assets
 
 class DebugOverlay:
     """
@@ -11,19 +14,29 @@ class DebugOverlay:
         self.font = pygame.font.SysFont(None, 24)
         self.enabled = True
         self.show_chunk_borders = True
+        # Screen rects of the text drawn last frame, the camera redraws under them
+        self.drawn_rects = []
         
     def toggle(self):
         """Toggle debug overlay on/off"""
         self.enabled = not self.enabled
+        self.game.level.all_sprites.redraw()
         
     def toggle_chunk_borders(self):
         """Toggle chunk border display"""
         self.show_chunk_borders = not self.show_chunk_borders
+        self.game.level.all_sprites.redraw()
+        
+    def toggle_profiler(self):
+        """Toggle frame phase timings on/off"""
+        profiler.toggle()
+        self.game.level.all_sprites.redraw()
         
     def draw(self, world, player, camera_group):
-        """Draw debug information"""
+        """Draw debug information, returns the screen rects of the text"""
+        self.drawn_rects = []
         if not self.enabled:
-            return
+            return self.drawn_rects
             
         # Get player position in world coordinates
         player_iso_x, player_iso_y = player.rect.center
@@ -39,6 +52,7 @@ class DebugOverlay:
         fps = self.clock.get_fps() 
         
         # Debug text
+        asset_stats = assets.get_stats()
         debug_info = [
             f"FPS: {fps:.1f}",
             f"Player ISO: ({player_iso_x}, {player_iso_y})",
@@ -47,19 +61,27 @@ class DebugOverlay:
             f"Biome: ({biome_at})",
             f"Loaded Chunks: {len(world.chunk_manager.chunks)}",
             f"Zoom: {camera_group.zoom:.1f}",
-            f"Sprites: {len(camera_group.sprites())}"
+            f"Sprites: {len(camera_group.sprites())}",
+            f"Assets: {asset_stats['assets']} ({asset_stats['memory'] / (1024 * 1024):.1f} MB, "
+            f"{asset_stats['unused']} unused)"
         ]
         
         # Draw text
         y_offset = 10
         for info in debug_info:
             text_surface = self.font.render(info, True, (255, 255, 255))
-            self.screen.blit(text_surface, (10, y_offset))
+            self.drawn_rects.append(self.screen.blit(text_surface, (10, y_offset)))
             y_offset += 25
+        
+        # Frame phase timings if the profiler is on
+        if profiler.enabled:
+            self._draw_profiler(y_offset + 10)
             
         # Draw chunk borders if enabled
         if self.show_chunk_borders:
+            # Lines only move with the camera, which redraws the whole screen when it does
             self._draw_chunk_borders(world, camera_group)
+        return self.drawn_rects
     
     def _draw_chunk_borders(self, world, camera_group):
         """Draw borders around chunks for debugging"""
@@ -91,4 +113,27 @@ class DebugOverlay:
             for i in range(4):
                 start = screen_corners[i]
                 end = screen_corners[(i + 1) % 4]
-                pygame.draw.line(self.screen, (255, 0, 0), start, end, 2)
\ No newline at end of file
+                pygame.draw.line(self.screen, (255, 0, 0), start, end, 2)
+    
+    def _draw_profiler(self, y_offset):
+        """Draw the average and p99 time of each frame phase, and a graph of recent frame times"""
+        for name, average, p99 in profiler.get_stats():
+            text_surface = self.font.render(f"{name}: {average:.2f} ms (p99 {p99:.2f} ms)", True, (255, 255, 0))
+            self.drawn_rects.append(self.screen.blit(text_surface, (10, y_offset)))
+            y_offset += 25
+        
+        # One bar per frame, the line marks the time a frame has at the target FPS
+        graph_rect = pygame.Rect(10, y_offset + 5, 2 * profiler.history_size, 100)
+        ms_height = graph_rect.height / 50  # Pixels per millisecond, the graph tops out at 50 ms
+        target_ms = 1000 / FPS
+        pygame.draw.rect(self.screen, (20, 20, 20), graph_rect)
+        for index, frame_time in enumerate(profiler.frame_times):
+            frame_ms = frame_time * 1000
+            bar_height = min(graph_rect.height, int(frame_ms * ms_height))
+            color = (0, 200, 0) if frame_ms <= target_ms * 1.1 else (220, 60, 60)
+            pygame.draw.rect(self.screen, color, (
+                graph_rect.left + index * 2, graph_rect.bottom - bar_height, 2, bar_height
+            ))
+        target_y = graph_rect.bottom - int(target_ms * ms_height)
+        pygame.draw.line(self.screen, (255, 255, 255), (graph_rect.left, target_y), (graph_rect.right - 1, target_y))
+        self.drawn_rects.append(graph_rect)
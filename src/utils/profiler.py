@@ -0,0 +1,120 @@
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Deque, Dict, List, Tuple
+
+# Returned by phase() while the profiler is off, so timed code costs a single call
+_NO_PHASE = nullcontext()
+
+
+class _Phase:
+    """Adds the time spent inside a with block to a phase of the current frame."""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+
+
+class _Sample:
+    """Records the time spent inside a with block as one sample of a named measurement."""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.samples.setdefault(self.name, []).append(time.perf_counter() - self.start)
+
+
+class FrameProfiler:
+    """
+    Times the phases of each frame and keeps the last history_size frames of them.
+    Phases can be timed several times a frame, the times are summed.
+    Work that is not tied to a frame, like chunks loaded on worker threads, is kept as
+    separate samples instead. Only collects anything while enabled.
+    """
+    def __init__(self, history_size: int = 120):
+        self.enabled = False
+        self.history_size = history_size
+        # Seconds spent per phase in the frame being run
+        self.current: Dict[str, float] = {}
+        # Seconds per phase and for the whole frame, one entry per finished frame
+        self.history: Dict[str, Deque[float]] = {}
+        self.frame_times: Deque[float] = deque(maxlen=history_size)
+        self.last_frame_end = None
+        # Seconds of every sample per measurement, since the last reset
+        self.samples: Dict[str, List[float]] = {}
+
+    def toggle(self):
+        """Turn collecting on/off, dropping what was collected so far."""
+        self.enabled = not self.enabled
+        self.reset()
+
+    def reset(self, history_size: int = None):
+        """Drop what was collected so far, optionally keeping a different number of frames from now on."""
+        if history_size is not None:
+            self.history_size = history_size
+        self.current.clear()
+        self.history.clear()
+        self.frame_times = deque(maxlen=self.history_size)
+        self.last_frame_end = None
+        self.samples = {}
+
+    def phase(self, name: str):
+        """Time a with block as part of the named phase."""
+        if not self.enabled:
+            return _NO_PHASE
+        return _Phase(self, name)
+
+    def sample(self, name: str):
+        """Time a with block as one sample of the named measurement, safe to use from worker threads."""
+        if not self.enabled:
+            return _NO_PHASE
+        return _Sample(self, name)
+
+    def add(self, name: str, seconds: float):
+        """Add time to the named phase of the current frame."""
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def end_frame(self):
+        """Store the phase times of the frame that just ended and start a new one."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.last_frame_end is not None:
+            self.frame_times.append(now - self.last_frame_end)
+        self.last_frame_end = now
+
+        # Phases that did not run this frame count as zero
+        for name in self.current.keys() - self.history.keys():
+            self.history[name] = deque([0.0] * len(self.frame_times), maxlen=self.history_size)
+        for name, times in self.history.items():
+            times.append(self.current.get(name, 0.0))
+        self.current.clear()
+
+    def get_stats(self) -> List[Tuple[str, float, float]]:
+        """Get (phase, average, p99) in milliseconds for every phase, the whole frame first."""
+        stats = []
+        for name, times in [('frame', self.frame_times), *self.history.items()]:
+            if not times:
+                continue
+            ordered = sorted(times)
+            average = sum(ordered) / len(ordered)
+            p99 = ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)]
+            stats.append((name, average * 1000, p99 * 1000))
+        return stats
+
+
+# Shared by the game loop and everything it times
+profiler = FrameProfiler()
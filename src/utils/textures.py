@@ -1,22 +1,68 @@
 import pygame
+import hashlib
+import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Bump when the face polygons change, so every tile is split again
+SPLIT_VERSION = 1
+
+# Define the 4-pt polygons for each face, using coords:
+FACE_POLYGONS = {
+    "top": [(14, 0), (17, 0), (31, 7), (31, 8), (17, 15), (14, 15), (0, 8), (0,7)],
+    "left": [(0,9), (1, 9), (15, 16), (15, 31), (14, 31), (0, 24)],
+    "right": [(31, 9), (31, 24), (17, 31), (16, 31), (16, 16), (30, 9)],
+}
+
+# All-white polygon masks by (face, size), the same for every tile
+_face_masks = {}
+
+
+def get_face_mask(face_name, size):
+    """Get the mask of a face for textures of the given size, drawing it on first use."""
+    mask = _face_masks.get((face_name, size))
+    if mask is None:
+        mask = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.polygon(mask, (255, 255, 255, 255), FACE_POLYGONS[face_name])
+        _face_masks[(face_name, size)] = mask
+    return mask
+
+
+def _init_worker():
+    """Give a worker process a display, textures are converted the same way as in the game."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+
+def _split_in_worker(input_dir, output_dir, filename):
+    """Split one texture in a worker process."""
+    TextureSplitter(input_dir, output_dir).split_texture(filename)
+    return filename
+
 
 class TextureSplitter:
     """
     Utility to pre-split isometric tile textures into separate face textures.
     This can be run separately to pre-process all your tile textures.
+    A manifest of source hashes in the output directory lets it only split tiles that changed.
     """
-    def __init__(self, input_dir="assets/textures/tiles", output_dir="assets/textures/faces"):
+    MANIFEST_NAME = "manifest.json"
+
+    def __init__(self, input_dir="assets/textures/tiles", output_dir="assets/textures/faces", min_parallel=8):
         """
         Initialize the texture splitter.
         
         Args:
             input_dir: Directory containing source tile textures
             output_dir: Directory where split faces will be saved
+            min_parallel: Split at least this many textures before using a process pool
         """
         self.input_dir = input_dir
         self.output_dir = output_dir
+        self.min_parallel = min_parallel
+        self.manifest_path = os.path.join(output_dir, self.MANIFEST_NAME)
         
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
@@ -42,19 +88,11 @@ class TextureSplitter:
         w, h = tex.get_size()
         assert (w, h) == (32, 32), "This splitter expects 32×32 sprites"
 
-        # Define the 4-pt polygons for each face, using coords:
-        top_pts   = [(14, 0), (17, 0), (31, 7), (31, 8), (17, 15), (14, 15), (0, 8), (0,7)]
-        right_pts = [(31, 9), (31, 24), (17, 31), (16, 31), (16, 16), (30, 9)]
-        left_pts  = [(0,9), (1, 9), (15, 16), (15, 31), (14, 31), (0, 24)]
-
         faces = {}
-        for name, pts in (("top", top_pts),
-                          ("left", left_pts),
-                          ("right", right_pts)):
+        for name in ("top", "left", "right"):
 
-            # Build an all-white mask for the polygon
-            mask = pygame.Surface((w, h), pygame.SRCALPHA)
-            pygame.draw.polygon(mask, (255, 255, 255, 255), pts)
+            # All-white mask for the polygon
+            mask = get_face_mask(name, (w, h))
 
             # Copy & multiply by mask: outside poly → zero alpha
             face = tex.copy()
@@ -74,17 +112,75 @@ class TextureSplitter:
         """
         Process all texture files in the input directory.
         """
-        # Get all PNG files in the input directory
-        pngs = [f for f in os.listdir(self.input_dir) if f.lower().endswith(".png")]
-        if not pngs:
+        self.split_textures(self._find_textures(), {})
+    
+    def split_changed_textures(self):
+        """
+        Process the texture files that changed since they were last split, or whose faces are missing.
+        Returns the names of the files that were split.
+        """
+        manifest = self._load_manifest()
+        changed = []
+        for fn in self._find_textures():
+            base = os.path.splitext(fn)[0]
+            faces_exist = all(
+                os.path.exists(os.path.join(self.output_dir, f"{base}_{name}.png")) for name in FACE_POLYGONS
+            )
+            if manifest.get(fn) != self._hash_texture(fn) or not faces_exist:
+                changed.append(fn)
+        if changed:
+            self.split_textures(changed, manifest)
+        return changed
+    
+    def split_textures(self, filenames, manifest):
+        """
+        Split the given texture files, across a process pool when there are enough of them,
+        and record the ones that were split in the manifest.
+        """
+        if not filenames:
             print(f"No PNGs in {self.input_dir}")
             return
-
-        for fn in pngs:
-            try:
-                self.split_texture(fn)
-            except Exception as e:
-                print(f"Error on {fn}: {e}")
+        
+        if len(filenames) >= self.min_parallel:
+            with ProcessPoolExecutor(initializer=_init_worker) as executor:
+                futures = {
+                    fn: executor.submit(_split_in_worker, self.input_dir, self.output_dir, fn) for fn in filenames
+                }
+                for fn, future in futures.items():
+                    try:
+                        future.result()
+                        manifest[fn] = self._hash_texture(fn)
+                    except Exception as e:
+                        print(f"Error on {fn}: {e}")
+        else:
+            for fn in filenames:
+                try:
+                    self.split_texture(fn)
+                    manifest[fn] = self._hash_texture(fn)
+                except Exception as e:
+                    print(f"Error on {fn}: {e}")
+        
+        # Forget textures that were removed
+        sources = set(self._find_textures())
+        manifest = {fn: digest for fn, digest in sorted(manifest.items()) if fn in sources}
+        with open(self.manifest_path, "w") as file:
+            json.dump(manifest, file, indent=4)
+    
+    def _find_textures(self):
+        """Get all PNG files in the input directory"""
+        return sorted(f for f in os.listdir(self.input_dir) if f.lower().endswith(".png"))
+    
+    def _hash_texture(self, filename):
+        """Hash a source texture together with the split version"""
+        with open(os.path.join(self.input_dir, filename), "rb") as file:
+            return hashlib.sha1(file.read() + f"v{SPLIT_VERSION}".encode()).hexdigest()
+    
+    def _load_manifest(self):
+        """Get the source hashes of the textures that were split, by file name"""
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as file:
+            return json.load(file)
 
 # If run as a standalone script, call pygame.init() and other
 if __name__ == "__main__":
@@ -96,14 +192,18 @@ if __name__ == "__main__":
     input_dir = "assets/textures/tiles"
     output_dir = "assets/textures/faces"
     
-    # Override directories if provided as arguments
-    if len(sys.argv) > 1:
-        input_dir = sys.argv[1]
-    if len(sys.argv) > 2:
-        output_dir = sys.argv[2]
+    # Override directories if provided as arguments, --all splits textures that did not change too
+    args = [arg for arg in sys.argv[1:] if arg != "--all"]
+    if len(args) > 0:
+        input_dir = args[0]
+    if len(args) > 1:
+        output_dir = args[1]
     
     splitter = TextureSplitter(input_dir, output_dir)
-    splitter.split_all_textures()
+    if "--all" in sys.argv:
+        splitter.split_all_textures()
+    else:
+        splitter.split_changed_textures()
     print("Texture splitting complete!")
     # End pygame
     pygame.quit()
\ No newline at end of file
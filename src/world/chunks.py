@@ -1,14 +1,28 @@
 import pygame
-from typing import Dict, Tuple, Set, List
-from sprites import Tile
-from settings import LAYERS
-from world.tiles import TileRenderer
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Tuple, Set, List, Optional
+from sprites import ChunkSprite
+from settings import LAYERS, SAVE_DIRECTORY, TASK_PRIORITIES
+from scheduler import scheduler
+from texture_cache import scaled_textures
+from utils.profiler import profiler
+from world.tiles import TileRenderer, TILE_TYPES, FACE_BITS, MAX_HEIGHT, tile_types_to_ids
 from world.noise import NoiseGenerator
+from world.regions import RegionStore
 
 class Chunk:
     """
     Represents a square chunk of the world grid.
+    Terrain is stored as arrays of tile ids, column heights and the visible faces
+    of every block, the visible faces are baked into a single chunk sprite.
+    Unloaded chunks are reused by the chunk manager, arrays, sprite and surface included.
     """
+    __slots__ = (
+        'chunk_x', 'chunk_y', 'chunk_size', 'tile_renderer', 'noise_gen', 'groups',
+        'tile_ids', 'heights', 'face_bits', 'sprite', 'dirty', 'edge_heights', 'is_generated'
+    )
+    
     def __init__(self, chunk_pos: Tuple[int, int], chunk_size: int, tile_renderer: TileRenderer, 
                  noise_gen: NoiseGenerator, groups: pygame.sprite.Group):
         # Chunk position in chunk coordinates (not tile coordinates)
@@ -18,18 +32,27 @@ class Chunk:
         self.noise_gen = noise_gen
         self.groups = groups
         
-        # Store all tiles in this chunk
-        self.tiles: Dict[Tuple[int, int], Tile] = {}
+        # Tile ids of this chunk indexed [local_y, local_x], see TILE_TYPES for the palette
+        self.tile_ids: np.ndarray = np.zeros((chunk_size, chunk_size), dtype=np.uint8)
+        # Blocks stacked in each tile column, 0 for empty tiles
+        self.heights: np.ndarray = np.zeros((chunk_size, chunk_size), dtype=np.uint8)
+        # Visible faces of each block as FACE_BITS flags, indexed [level, local_y, local_x]
+        self.face_bits: np.ndarray = np.zeros((MAX_HEIGHT, chunk_size, chunk_size), dtype=np.uint8)
+        # Sprite holding the baked faces, rebaked when the visible faces change
+        self.sprite: Optional[ChunkSprite] = None
+        self.dirty = False
+        # Column heights just across the east and south edges, as last used for the faces
+        self.edge_heights: Dict[str, np.ndarray] = {
+            'east': np.zeros(chunk_size, dtype=np.uint8),
+            'south': np.zeros(chunk_size, dtype=np.uint8)
+        }
         
         # Track if this chunk has been generated
         self.is_generated = False
         
-        # Tile set mapping
-        self.tile_set_mapping = {
-            "grass_block": "grass_block",
-            "red_grass_block": "red_grass_block",
-            # Add more tile types here
-        }
+    def reset(self, chunk_pos: Tuple[int, int]):
+        """Make an unloaded chunk the chunk at chunk_pos, ready to be built again."""
+        self.chunk_x, self.chunk_y = chunk_pos
         
     def world_to_chunk_coords(self, world_x: int, world_y: int) -> Tuple[int, int]:
         """Convert world coordinates to local chunk coordinates."""
@@ -43,163 +66,183 @@ class Chunk:
         world_y = local_y + (self.chunk_y * self.chunk_size)
         return world_x, world_y
     
-    def get_tile_at(self, world_x: int, world_y: int) -> Tile:
-        """Get tile at the specified world coordinates."""
-        return self.tiles.get((world_x, world_y))
+    def get_tile_at(self, world_x: int, world_y: int) -> Optional[str]:
+        """Get the tile type at the specified world coordinates, None if there is no tile."""
+        local_x, local_y = self.world_to_chunk_coords(world_x, world_y)
+        if not (0 <= local_x < self.chunk_size and 0 <= local_y < self.chunk_size):
+            return None
+        tile_id = self.tile_ids[local_y, local_x]
+        return TILE_TYPES[tile_id] if tile_id else None
+    
+    def sample_tiles(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sample the tile ids and column heights of the whole chunk plus a one-tile border in one call,
+        the border tells us how tall the neighbouring columns in other chunks are.
+        This does not touch any sprites, so it is safe to run on a worker thread.
+        """
+        origin_x, origin_y = self.chunk_to_world_coords(0, 0)
+        tile_types, elevations = self.noise_gen.get_terrain_grid(
+            origin_x - 1, origin_y - 1, self.chunk_size + 2, self.chunk_size + 2
+        )
+        tile_ids = tile_types_to_ids(tile_types)
+        # Columns stand on the lowest level, elevation 0 is one block high
+        heights = np.where(tile_ids != 0, elevations + 1, 0).astype(np.uint8)
+        return tile_ids, heights
+    
+    def grids_from_stored(self, tile_ids: np.ndarray, heights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Make grids like sample_tiles returns from the stored tiles of this chunk.
+        Stored chunks have no border, so columns in adjacent chunks are assumed to be as tall
+        as the ones at the edge until the chunk manager updates the faces against the loaded neighbours.
+        """
+        return np.pad(tile_ids, 1, mode='edge'), np.pad(heights, 1, mode='edge')
     
-    def generate(self):
-        """Generate all tiles for this chunk using noise."""
+    def build(self, tile_grid: np.ndarray, height_grid: np.ndarray):
+        """Store the tiles of this chunk from grids made by sample_tiles and create its faces."""
         if self.is_generated:
             return
-        # First pass - create all tiles but don't add faces yet
-        for local_y in range(self.chunk_size):
-            for local_x in range(self.chunk_size):
-                # Convert to world coordinates
-                world_x, world_y = self.chunk_to_world_coords(local_x, local_y)
-                # Get tile type based on noise
-                tile_type = self.noise_gen.get_tile_type(world_x, world_y)
-                # Calculate isometric position
-                iso_x, iso_y = self.tile_renderer.cart_to_iso(world_x, world_y)
-                # Create the tile
-                new_tile = Tile(
-                    pos=(iso_x, iso_y),
+        self.tile_ids[:] = tile_grid[1:-1, 1:-1]
+        self.heights[:] = height_grid[1:-1, 1:-1]
+        # Use the border of the grid for columns in adjacent chunks
+        self.edge_heights['east'] = height_grid[1:-1, -1].copy()
+        self.edge_heights['south'] = height_grid[-1, 1:-1].copy()
+        face_bits = self._compute_face_bits(self.edge_heights['east'], self.edge_heights['south'])
+        self._set_face_bits(face_bits, (slice(None), slice(None), slice(None)))
+        self.is_generated = True
+    
+    def _compute_face_bits(self, east_heights: np.ndarray, south_heights: np.ndarray) -> np.ndarray:
+        """
+        Work out the visible faces of every block.
+        east_heights and south_heights are the heights of the columns just past the east column
+        and south row of this chunk.
+        
+        A face is hidden when a block touches it, and a whole block is hidden when a block
+        of this chunk sits in front of it along the view diagonal: (x + 1, y + 1, level + 1)
+        is drawn exactly over (x, y, level). Columns whose blocks are all hidden get no faces.
+        """
+        heights = self.heights.astype(np.int16)
+        levels = np.arange(MAX_HEIGHT, dtype=np.int16)[:, None, None]
+        solid = levels < heights
+        # Heights of the east and south neighbour of every column
+        east = np.empty_like(heights)
+        east[:, :-1] = heights[:, 1:]
+        east[:, -1] = east_heights
+        south = np.empty_like(heights)
+        south[:-1, :] = heights[1:, :]
+        south[-1, :] = south_heights
+        
+        # Blocks covered by a block further along the view diagonal
+        covered = np.zeros(solid.shape, dtype=bool)
+        for step in range(1, MAX_HEIGHT):
+            front = np.zeros_like(heights)
+            front[:-step, :-step] = heights[step:, step:]
+            covered |= front > levels + step
+        visible = solid & ~covered
+        
+        face_bits = np.where(visible & (levels == heights - 1), FACE_BITS['top'], 0)
+        face_bits |= np.where(visible & (levels >= east), FACE_BITS['right'], 0)
+        face_bits |= np.where(visible & (levels >= south), FACE_BITS['left'], 0)
+        return face_bits.astype(np.uint8)
+    
+    def _set_face_bits(self, face_bits: np.ndarray, region: Tuple[slice, slice, slice]):
+        """Update the visible faces within region, the chunk is rebaked if any changed."""
+        if np.array_equal(face_bits[region], self.face_bits[region]):
+            return
+        self.face_bits[region] = face_bits[region]
+        self.dirty = True
+    
+    def bake(self):
+        """Composite the visible faces into the chunk sprite, reusing its surface."""
+        origin = self.chunk_to_world_coords(0, 0)
+        if self.sprite and self.sprite.alive():
+            self.tile_renderer.bake_chunk(origin, self.tile_ids, self.face_bits, self.sprite.image)
+            # Scaled copies of the old surface are stale now
+            scaled_textures.invalidate(self.sprite.texture_key)
+        else:
+            chunk_rect = self.tile_renderer.get_chunk_rect(origin, self.chunk_size)
+            # Chunks further back are drawn first, like the faces inside a chunk
+            zlayer = LAYERS['ground'] + sum(origin) / 10000.0
+            if self.sprite:
+                # Reused chunk, its sprite and surface move here
+                surface = self.tile_renderer.bake_chunk(origin, self.tile_ids, self.face_bits, self.sprite.image)
+                self.sprite.reset((self.chunk_x, self.chunk_y), chunk_rect.topleft, zlayer)
+                self.sprite.add(self.groups)
+            else:
+                surface = self.tile_renderer.bake_chunk(origin, self.tile_ids, self.face_bits)
+                self.sprite = ChunkSprite(
+                    chunk_pos=(self.chunk_x, self.chunk_y),
+                    pos=chunk_rect.topleft,
+                    surface=surface,
                     groups=self.groups,
-                    zlayer=LAYERS['ground'],
-                    grid_pos=(world_x, world_y),
-                    tile_type=tile_type
+                    zlayer=zlayer
                 )
-                # Store the tile
-                self.tiles[(world_x, world_y)] = new_tile
-        
+            scaled_textures.register(self.sprite.texture_key, surface)
+        self.dirty = False
+    
+    def get_edge_heights(self, side: str) -> np.ndarray:
+        """Get the column heights along the west or north side, as seen by the neighbouring chunk."""
+        if side == 'west':
+            return self.heights[:, 0].copy()
+        if side == 'north':
+            return self.heights[0, :].copy()
+        raise ValueError(f"Unknown chunk side '{side}'")
+    
+    def set_edge(self, edge: str, neighbour_heights: np.ndarray):
+        """
+        Update the side faces along the east or south edge of this chunk.
+        neighbour_heights are the heights of the columns just across the edge, only that
+        column or row of faces is updated and only if they changed.
+        """
+        if np.array_equal(self.edge_heights[edge], neighbour_heights):
+            return
+        self.edge_heights[edge] = neighbour_heights
         
-        # Now during second pass - add faces while checking adjacent chunks
-        for world_pos, tile in self.tiles.items():
-            world_x, world_y = world_pos
-            
-            # Create top face for all tiles
-            self.tile_renderer.create_face(tile, 'top', tile.tile_type)
-            
-            # Check if we need side faces - this needs to check both within this chunk AND in adjacent chunks
-            # East neighbor
-            east_pos = (world_x + 1, world_y)
-            east_neighbor = self.tiles.get(east_pos)
-            
-            # If no east neighbor in this chunk, check if there's a tile in an adjacent chunk
-            if east_neighbor is None:
-                # This position might be in a neighboring chunk
-                east_chunk_pos = self.get_chunk_pos_for_world_pos(east_pos[0], east_pos[1])
-                
-                # Only add the face if there's definitely no tile there
-                if not self.tile_exists_at_world_pos(east_pos[0], east_pos[1]):
-                    self.tile_renderer.create_face(tile, 'right', tile.tile_type)
-            
-            # South neighbor - same logic
-            south_pos = (world_x, world_y + 1)
-            south_neighbor = self.tiles.get(south_pos)
-            
-            if south_neighbor is None:
-                # This position might be in a neighboring chunk
-                south_chunk_pos = self.get_chunk_pos_for_world_pos(south_pos[0], south_pos[1])
-                
-                # Only add the face if there's definitely no tile there 
-                if not self.tile_exists_at_world_pos(south_pos[0], south_pos[1]):
-                    self.tile_renderer.create_face(tile, 'left', tile.tile_type)
-                
-        self.is_generated = True
+        face_bits = self._compute_face_bits(self.edge_heights['east'], self.edge_heights['south'])
+        if edge == 'east':
+            region = (slice(None), slice(None), slice(self.chunk_size - 1, None))
+        elif edge == 'south':
+            region = (slice(None), slice(self.chunk_size - 1, None), slice(None))
+        else:
+            raise ValueError(f"Unknown chunk edge '{edge}'")
+        self._set_face_bits(face_bits, region)
     
     def get_chunk_pos_for_world_pos(self, world_x, world_y):
         """Get the chunk coordinates that would contain the given world position."""
         chunk_x = world_x // self.chunk_size
         chunk_y = world_y // self.chunk_size
         return chunk_x, chunk_y
-        
-    def tile_exists_at_world_pos(self, world_x, world_y):
-        """Check if a tile exists at the specified world position, including in other chunks."""
-        # First check within this chunk
-        if (world_x, world_y) in self.tiles:
-            return True
-            
-        # Not in this chunk, so it would be in another chunk
-        # But we don't have direct access to other chunks here
-        # Instead, we'll use a clever trick for chunk border logic
-        
-        # If this position is exactly on a chunk boundary, assume it exists
-        # This prevents creating side faces at chunk boundaries
-        chunk_x, chunk_y = self.get_chunk_pos_for_world_pos(world_x, world_y)
-        
-        # If it's a different chunk than this one
-        if chunk_x != self.chunk_x or chunk_y != self.chunk_y:
-            # Calculate the closest edge of that chunk
-            chunk_edge_x = chunk_x * self.chunk_size
-            chunk_edge_y = chunk_y * self.chunk_size
-            
-            # If this is exactly on the edge of a chunk, 
-            # assume there is a tile there to prevent visible seams
-            if world_x == chunk_edge_x or world_y == chunk_edge_y:
-                return True
-            
-            # For positions inside other chunks, use noise to determine if a tile would exist there
-            # This ensures consistency across chunk boundaries
-            return self.noise_gen.get_tile_type(world_x, world_y) != None
-            
-        return False
     
     def update_faces(self, chunk_manager):
         """
-        Update tile faces based on neighboring tiles (including those in adjacent chunks).
-        This should be called after all chunks in the view distance are generated.
+        Update the faces along the edges of this chunk based on the neighbouring chunks.
+        Faces inside the chunk only depend on its own tiles and never change after build.
         """
-        for world_pos, tile in self.tiles.items():
-            world_x, world_y = world_pos
-            
-            # First, remove any existing faces to prevent duplicates
-            for face_type, face in list(tile.faces.items()):
-                if face:
-                    face.kill()
-                    tile.faces[face_type] = None
-            
-            # Create top face for all tiles
-            self.tile_renderer.create_face(tile, 'top', tile.tile_type)
-            
-            # Check if we need side faces by checking if neighbors exist
-            # East neighbor - Could be in this chunk or adjacent chunk
-            east_neighbor = self.tiles.get((world_x + 1, world_y))
-            if not east_neighbor:
-                # Check if it's in another chunk
-                east_neighbor = chunk_manager.get_tile_at(world_x + 1, world_y)
-            
-            if not east_neighbor:
-                self.tile_renderer.create_face(tile, 'right', tile.tile_type)
-            
-            # South neighbor - Could be in this chunk or adjacent chunk
-            south_neighbor = self.tiles.get((world_x, world_y + 1))
-            if not south_neighbor:
-                # Check if it's in another chunk
-                south_neighbor = chunk_manager.get_tile_at(world_x, world_y + 1)
-                
-            if not south_neighbor:
-                self.tile_renderer.create_face(tile, 'left', tile.tile_type)
+        east_pos = (self.chunk_x + 1, self.chunk_y)
+        south_pos = (self.chunk_x, self.chunk_y + 1)
+        self.set_edge('east', chunk_manager.get_neighbour_edge(east_pos, 'west'))
+        self.set_edge('south', chunk_manager.get_neighbour_edge(south_pos, 'north'))
     
     def unload(self):
-        """Remove all tiles in this chunk from the game."""
-        for tile in self.tiles.values():
-            # Remove all faces
-            for face in tile.faces.values():
-                if face:
-                    face.kill()
-            # Remove the tile itself
-            tile.kill()
-        
-        # Clear the tiles dictionary
-        self.tiles.clear()
+        """Remove all tiles in this chunk from the game, the killed sprite is kept for reuse."""
+        if self.sprite and self.sprite.alive():
+            scaled_textures.unregister(self.sprite.texture_key)
+            self.sprite.kill()
+        
+        # Clear the tile data
+        self.dirty = False
+        self.tile_ids[:] = 0
+        self.heights[:] = 0
+        self.face_bits[:] = 0
         self.is_generated = False
 
 
 class ChunkManager:
     """
     Handles loading and unloading chunks around the player.
+    Noise sampling runs on a worker pool, the sprites of finished chunks are
+    baked on the main thread by the frame scheduler, in the time frames have left.
     """
-    def __init__(self, groups: pygame.sprite.Group, noise_gen: NoiseGenerator):
+    def __init__(self, groups: pygame.sprite.Group, noise_gen: NoiseGenerator, save_directory: str = SAVE_DIRECTORY):
         self.groups = groups
         self.chunk_size = 8  # Size of each chunk in tiles (reduced from 16)
         self.render_distance = 2  # How many chunks to render in each direction
@@ -208,9 +251,20 @@ class ChunkManager:
         self.tile_renderer: TileRenderer = TileRenderer(groups=groups)
         self.noise_gen: NoiseGenerator = noise_gen
         
+        # Generated chunks are kept on disk per seed, so revisits skip the noise
+        self.region_store = RegionStore(f"{save_directory}/{noise_gen.seed}/regions", self.chunk_size)
+        
         # Store loaded chunks
         self.chunks: Dict[Tuple[int, int], Chunk] = {}
         
+        # Unloaded chunks waiting to be reused, at most one view worth
+        self.chunk_pool: List[Chunk] = []
+        self.max_pooled_chunks = (2 * self.render_distance + 1) ** 2
+        
+        # Chunks being sampled on the worker pool, integrated once their future is done
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chunk_gen")
+        self.pending_chunks: Dict[Tuple[int, int], Tuple[Chunk, Future]] = {}
+        
         # Track the last player chunk for chunk loading/unloading
         self.last_player_chunk = None
     
@@ -220,8 +274,8 @@ class ChunkManager:
         chunk_y = world_y // self.chunk_size
         return chunk_x, chunk_y
     
-    def get_tile_at(self, world_x: int, world_y: int) -> Tile:
-        """Get the tile at the specified world coordinates."""
+    def get_tile_at(self, world_x: int, world_y: int) -> Optional[str]:
+        """Get the tile type at the specified world coordinates."""
         chunk_pos = self.get_chunk_pos_for_world_pos(world_x, world_y)
         
         # Get or create the chunk
@@ -230,6 +284,86 @@ class ChunkManager:
             return chunk.get_tile_at(world_x, world_y)
         return None
         
+    def get_tile_ids(self, world_xs: np.ndarray, world_ys: np.ndarray) -> np.ndarray:
+        """
+        Get the tile ids at arrays of world coordinates in one call, 0 where there is no tile.
+        Tiles in chunks that are not loaded count as missing, like in get_tile_at.
+        Coordinates are floored, the result has their broadcast shape.
+        """
+        return self._lookup('tile_ids', world_xs, world_ys)
+    
+    def get_heights(self, world_xs: np.ndarray, world_ys: np.ndarray) -> np.ndarray:
+        """Get the column heights at arrays of world coordinates in one call, like get_tile_ids."""
+        return self._lookup('heights', world_xs, world_ys)
+    
+    def _lookup(self, layer: str, world_xs: np.ndarray, world_ys: np.ndarray) -> np.ndarray:
+        """Index a per-tile array of the chunks, 'tile_ids' or 'heights', at arrays of world coordinates."""
+        world_xs, world_ys = np.broadcast_arrays(
+            np.floor(world_xs).astype(np.int64), np.floor(world_ys).astype(np.int64)
+        )
+        return self._index_layer(self._merge_layer(layer), world_xs, world_ys)
+    
+    def _merge_layer(self, layer: str) -> Tuple[np.ndarray, int, int]:
+        """
+        Copy a per-tile array of every loaded chunk into one array over the area they cover,
+        with zeros where no chunk is loaded and a border of zeros one tile wide.
+        Returns the array and the world coordinates of its first tile inside the border.
+        """
+        if not self.chunks:
+            return np.zeros((1, 1), dtype=np.uint8), 0, 0
+        positions = np.array(list(self.chunks.keys()), dtype=np.int64)
+        min_x, min_y = positions.min(axis=0)
+        max_x, max_y = positions.max(axis=0)
+        size = self.chunk_size
+        merged = np.zeros(((max_y - min_y + 1) * size + 2, (max_x - min_x + 1) * size + 2), dtype=np.uint8)
+        for (chunk_x, chunk_y), chunk in self.chunks.items():
+            top = (chunk_y - min_y) * size + 1
+            left = (chunk_x - min_x) * size + 1
+            merged[top:top + size, left:left + size] = getattr(chunk, layer)
+        return merged, int(min_x) * size, int(min_y) * size
+    
+    @staticmethod
+    def _index_layer(merged_layer: Tuple[np.ndarray, int, int],
+                     world_xs: np.ndarray, world_ys: np.ndarray) -> np.ndarray:
+        """Index a layer from _merge_layer at integer world coordinates."""
+        merged, origin_x, origin_y = merged_layer
+        # Coordinates outside the loaded area are clipped onto the border of zeros
+        xs = np.clip(world_xs - origin_x + 1, 0, merged.shape[1] - 1)
+        ys = np.clip(world_ys - origin_y + 1, 0, merged.shape[0] - 1)
+        return merged[ys, xs]
+    
+    def pick_tiles(self, iso_xs: np.ndarray, iso_ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the grid positions of the tile columns drawn at arrays of isometric pixel coordinates.
+        The view ray through each point is followed front to back through the blocks of the
+        loaded chunks, points that hit no block get the tile at the lowest level.
+        """
+        grid_xs, grid_ys = self.tile_renderer.iso_to_ground(iso_xs, iso_ys)
+        shape = np.shape(grid_xs)
+        grid_xs, grid_ys = np.atleast_1d(grid_xs), np.atleast_1d(grid_ys)
+        # Floor so tiles at negative coordinates are not shifted towards 0
+        base_xs = np.floor(grid_xs).astype(np.int64)
+        base_ys = np.floor(grid_ys).astype(np.int64)
+        # The ray crosses into the column to the west or to the north first, depending on
+        # which side of the diagonal it runs through the tiles
+        west_first = grid_xs - base_xs < grid_ys - base_ys
+        north_first = grid_xs - base_xs > grid_ys - base_ys
+        
+        # Every probe below reads the same heights, merge them once
+        heights = self._merge_layer('heights')
+        picked_xs, picked_ys = base_xs.copy(), base_ys.copy()
+        found = np.zeros(base_xs.shape, dtype=bool)
+        # Going down a level moves the ray one tile back on both axes
+        for level in range(MAX_HEIGHT - 1, -1, -1):
+            for passes, step_x, step_y in ((True, 0, 0), (west_first, -1, 0), (north_first, 0, -1), (True, -1, -1)):
+                xs = base_xs + level + step_x
+                ys = base_ys + level + step_y
+                hit = passes & ~found & (self._index_layer(heights, xs, ys) > level)
+                picked_xs[hit] = xs[hit]
+                picked_ys[hit] = ys[hit]
+                found |= hit
+        return picked_xs.reshape(shape), picked_ys.reshape(shape)
+        
     def check_tile_at(self, world_x: int, world_y: int) -> bool:
         """Check if a tile exists at the specified world coordinates without loading chunks."""
         chunk_pos = self.get_chunk_pos_for_world_pos(world_x, world_y)
@@ -237,14 +371,17 @@ class ChunkManager:
         # If chunk is loaded, check the actual tile
         if chunk_pos in self.chunks:
             chunk = self.chunks[chunk_pos]
-            return (world_x, world_y) in chunk.tiles
+            return chunk.get_tile_at(world_x, world_y) is not None
         
         # If chunk isn't loaded, use noise to predict if a tile would exist there
         # This ensures consistent chunk borders
         return self.noise_gen.get_tile_type(world_x, world_y) != None
     
-    def update_chunks(self, player_pos: Tuple[int, int]):
-        """Update loaded chunks based on player position."""
+    def update_chunks(self, player_pos: Tuple[int, int], wait: bool = False):
+        """
+        Update loaded chunks based on player position.
+        When wait is True, block until every requested chunk is built (used for the first load).
+        """
         # Convert player's isometric position to approximate world coordinates
         player_iso_x, player_iso_y = player_pos
         
@@ -256,12 +393,21 @@ class ChunkManager:
         # Get chunk position
         player_chunk_pos = self.get_chunk_pos_for_world_pos(player_world_x, player_world_y)
         
-        # If player hasn't moved to a new chunk, no need to update
-        if player_chunk_pos == self.last_player_chunk:
-            return
-            
-        self.last_player_chunk = player_chunk_pos
+        # Only request and drop chunks when the player moved to a new chunk
+        if player_chunk_pos != self.last_player_chunk:
+            self.last_player_chunk = player_chunk_pos
+            self._request_chunks(player_chunk_pos)
         
+        # Store the chunks whose noise is ready, then bake their sprites after the frame is drawn
+        self._integrate_chunks(wait=wait)
+        if wait:
+            for _ in self._bake_dirty_chunks():
+                pass
+        elif not scheduler.is_queued('bake_chunks') and any(chunk.dirty for chunk in self.chunks.values()):
+            scheduler.submit(self._bake_dirty_chunks(), TASK_PRIORITIES['chunks'], name='bake_chunks')
+    
+    def _request_chunks(self, player_chunk_pos: Tuple[int, int]):
+        """Submit missing chunks around the player to the worker pool and unload far ones."""
         # Determine which chunks should be loaded
         chunks_to_load = set()
         player_chunk_x, player_chunk_y = player_chunk_pos
@@ -271,52 +417,150 @@ class ChunkManager:
                 chunk_pos = (player_chunk_x + dx, player_chunk_y + dy)
                 chunks_to_load.add(chunk_pos)
         
-        # Determine which chunks to unload
-        chunks_to_unload = set(self.chunks.keys()) - chunks_to_load
+        # Drop requests that went out of range before they finished, chunks whose sampling
+        # never started go back to the pool, running ones are still written to by their worker
+        for chunk_pos in list(self.pending_chunks):
+            if chunk_pos not in chunks_to_load:
+                chunk, future = self.pending_chunks.pop(chunk_pos)
+                if future.cancel():
+                    self._pool_chunk(chunk)
         
-        # First load new chunks at chunk boundaries
-        # This ensures borders are generated properly with knowledge of neighboring chunks
-        border_chunks = []
-        new_inner_chunks = []
-        
-        for chunk_pos in chunks_to_load:
-            if chunk_pos not in self.chunks:
-                # Check if this is a border chunk (has neighbors)
-                is_border = False
-                for dx, dy in [(1,0), (-1,0), (0,1), (0,-1)]:
-                    neighbor_pos = (chunk_pos[0] + dx, chunk_pos[1] + dy)
-                    if neighbor_pos in self.chunks:
-                        is_border = True
-                        break
-                
-                # Sort chunks so borders are generated first
-                if is_border:
-                    border_chunks.append(chunk_pos)
-                else:
-                    new_inner_chunks.append(chunk_pos)
-        
-        # First create all the chunks without generating them
-        for chunk_pos in border_chunks + new_inner_chunks:
-            if chunk_pos not in self.chunks:
-                new_chunk = Chunk(
-                    chunk_pos=chunk_pos,
-                    chunk_size=self.chunk_size,
-                    tile_renderer=self.tile_renderer,
-                    noise_gen=self.noise_gen,
-                    groups=self.groups
-                )
-                self.chunks[chunk_pos] = new_chunk
+        # Submit the closest chunks first so they are ready first
+        new_chunks = [
+            chunk_pos for chunk_pos in chunks_to_load
+            if chunk_pos not in self.chunks and chunk_pos not in self.pending_chunks
+        ]
+        new_chunks.sort(key=lambda pos: self._chunk_distance(pos, player_chunk_pos))
+        for chunk_pos in new_chunks:
+            new_chunk = self._new_chunk(chunk_pos)
+            future = self.executor.submit(self._load_chunk_tiles, new_chunk)
+            self.pending_chunks[chunk_pos] = (new_chunk, future)
         
-        # Now generate all the chunks
-        for chunk_pos in border_chunks + new_inner_chunks:
-            self.chunks[chunk_pos].generate()
+        # Unload chunks that are out of range, their neighbours need new faces
+        chunks_to_unload = set(self.chunks.keys()) - chunks_to_load
+        changed_chunks = set()
+        for chunk_pos in chunks_to_unload:
+            self._pool_chunk(self.chunks.pop(chunk_pos))
+            changed_chunks.add(chunk_pos)
+        self._update_edges(changed_chunks)
+    
+    def _pool_chunk(self, chunk: Chunk):
+        """Unload a chunk and keep it for reuse, unless the pool is full."""
+        chunk.unload()
+        if len(self.chunk_pool) < self.max_pooled_chunks:
+            self.chunk_pool.append(chunk)
+    
+    def _new_chunk(self, chunk_pos: Tuple[int, int]) -> Chunk:
+        """Get an empty chunk for chunk_pos, reusing an unloaded one if there is one."""
+        if self.chunk_pool:
+            chunk = self.chunk_pool.pop()
+            chunk.reset(chunk_pos)
+            return chunk
+        return Chunk(
+            chunk_pos=chunk_pos,
+            chunk_size=self.chunk_size,
+            tile_renderer=self.tile_renderer,
+            noise_gen=self.noise_gen,
+            groups=self.groups
+        )
+    
+    def _load_chunk_tiles(self, chunk: Chunk) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the tile id and height grids of a chunk from its region file, or sample the noise and store them.
+        Runs on the worker pool, timed as 'chunk_load' samples while the profiler is on.
+        """
+        with profiler.sample('chunk_load'):
+            stored = self.region_store.load_chunk(chunk.chunk_x, chunk.chunk_y)
+            if stored is not None:
+                return chunk.grids_from_stored(*stored)
+            
+            tile_grid, height_grid = chunk.sample_tiles()
+            # Only the chunk itself is stored, the border belongs to the neighbours
+            self.region_store.save_chunk(chunk.chunk_x, chunk.chunk_y, tile_grid[1:-1, 1:-1], height_grid[1:-1, 1:-1])
+            return tile_grid, height_grid
+    
+    def _integrate_chunks(self, wait: bool = False):
+        """
+        Store the tiles of chunks whose noise is ready and update the edges around them.
+        This only touches arrays, the sprites are made by _bake_dirty_chunks.
+        """
+        if wait:
+            for _, future in self.pending_chunks.values():
+                future.result()
         
-        # update faces on *all* loaded chunks
-        for chunk in self.chunks.values():
-            chunk.update_faces(self)
+        ready_chunks = [
+            chunk_pos for chunk_pos, (_, future) in self.pending_chunks.items() if future.done()
+        ]
+        changed_chunks = set()
+        for chunk_pos in ready_chunks:
+            chunk, future = self.pending_chunks.pop(chunk_pos)
+            chunk.build(*future.result())
+            self.chunks[chunk_pos] = chunk
+            changed_chunks.add(chunk_pos)
         
-        # Unload chunks after loading new ones to avoid flickering at borders
-        for chunk_pos in chunks_to_unload:
-            if chunk_pos in self.chunks:
-                self.chunks[chunk_pos].unload()
-                del self.chunks[chunk_pos]
\ No newline at end of file
+        # The edges of the new chunks and of the chunks bordering them need their faces updated
+        self._update_edges(changed_chunks)
+    
+    def get_neighbour_edge(self, chunk_pos: Tuple[int, int], side: str) -> np.ndarray:
+        """
+        Get the column heights along one side of the chunk at chunk_pos.
+        Columns in chunks that are not loaded count as missing, so the edge of the view gets side faces.
+        """
+        chunk = self.chunks.get(chunk_pos)
+        if chunk:
+            return chunk.get_edge_heights(side)
+        return np.zeros(self.chunk_size, dtype=np.uint8)
+    
+    def _update_edges(self, changed_chunks: Set[Tuple[int, int]]):
+        """
+        Update the edge faces touching chunks that were loaded or unloaded.
+        Side faces look east and south, so only the east edge of the chunk to the west
+        and the south edge of the chunk to the north depend on a changed chunk.
+        """
+        for chunk_x, chunk_y in changed_chunks:
+            chunk = self.chunks.get((chunk_x, chunk_y))
+            if chunk:
+                chunk.update_faces(self)
+            
+            west_chunk = self.chunks.get((chunk_x - 1, chunk_y))
+            if west_chunk:
+                west_chunk.set_edge('east', self.get_neighbour_edge((chunk_x, chunk_y), 'west'))
+            
+            north_chunk = self.chunks.get((chunk_x, chunk_y - 1))
+            if north_chunk:
+                north_chunk.set_edge('south', self.get_neighbour_edge((chunk_x, chunk_y), 'north'))
+    
+    def _bake_dirty_chunks(self):
+        """
+        Scheduler task that rebakes the sprites of chunks whose visible faces changed,
+        closest to the player first, pausing after each chunk.
+        Chunks are picked again after every pause, as the player or the loaded chunks may have changed.
+        """
+        while True:
+            dirty_chunks = [chunk for chunk in self.chunks.values() if chunk.dirty]
+            if not dirty_chunks:
+                return
+            chunk = min(dirty_chunks, key=lambda chunk: self._chunk_distance(
+                (chunk.chunk_x, chunk.chunk_y), self.last_player_chunk
+            ))
+            chunk.bake()
+            yield
+    
+    def _chunk_distance(self, chunk_pos: Tuple[int, int], center_pos: Tuple[int, int]) -> int:
+        """Chebyshev distance between two chunk positions."""
+        return max(abs(chunk_pos[0] - center_pos[0]), abs(chunk_pos[1] - center_pos[1]))
+    
+    def shutdown(self):
+        """
+        Stop the worker pool, dropping chunks that were not sampled yet, unload the loaded
+        chunks, close the region files and release the tile textures.
+        """
+        scheduler.cancel('bake_chunks')
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.pending_chunks.clear()
+        for chunk in self.chunks.values():
+            chunk.unload()
+        self.chunks.clear()
+        self.chunk_pool.clear()
+        self.region_store.close()
+        self.tile_renderer.release_textures()
@@ -4,6 +4,75 @@ import random
 import numpy as np
 from typing import Tuple, Dict, List, Any
 
+# Permutation table of the `noise` library's simplex implementation (doubled to avoid wrapping)
+_PERM = np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225,
+    140, 36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148,
+    247, 120, 234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32,
+    57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175,
+    74, 165, 71, 134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122,
+    60, 211, 133, 230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54,
+    65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169,
+    200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64,
+    52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212,
+    207, 206, 59, 227, 47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213,
+    119, 248, 152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9,
+    129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185, 112, 104,
+    218, 246, 97, 228, 251, 34, 242, 193, 238, 210, 144, 12, 191, 179, 162, 241,
+    81, 51, 145, 235, 249, 14, 239, 107, 49, 192, 214, 31, 181, 199, 106, 157,
+    184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150, 254, 138, 236, 205, 93,
+    222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156, 180,
+], dtype=np.int32)
+_PERM = np.concatenate((_PERM, _PERM))
+
+# X and Y components of the twelve simplex gradients
+_GRAD_X = np.array([1, -1, 1, -1, 1, -1, 1, -1, 0, 0, 0, 0], dtype=np.float32)
+_GRAD_Y = np.array([1, 1, -1, -1, 0, 0, 0, 0, 1, -1, 1, -1], dtype=np.float32)
+
+# 2D simplex skew factors
+_F2 = np.float32(0.3660254037844386)
+_G2 = np.float32(0.21132486540518713)
+
+
+def simplex2(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Vectorized port of `noise.snoise2` for a single octave.
+    Works in float32 with the same operation order as the C code, so the
+    results match the scalar calls exactly.
+    """
+    x = np.asarray(x, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    # Skew the input space to find the simplex cell
+    s = (x + y) * _F2
+    i = np.floor(x + s)
+    j = np.floor(y + s)
+    t = (i + j) * _G2
+    # Distances from the three simplex corners
+    x0 = x - (i - t)
+    y0 = y - (j - t)
+    i1 = (x0 > y0).astype(np.float32)
+    j1 = (x0 <= y0).astype(np.float32)
+    x1 = x0 - i1 + _G2
+    y1 = y0 - j1 + _G2
+    x2 = x0 + _G2 * np.float32(2.0) - np.float32(1.0)
+    y2 = y0 + _G2 * np.float32(2.0) - np.float32(1.0)
+    # Hashed gradient indices of the corners
+    ii = i.astype(np.int32) & 255
+    jj = j.astype(np.int32) & 255
+    i1 = i1.astype(np.int32)
+    j1 = j1.astype(np.int32)
+    g0 = _PERM[ii + _PERM[jj]] % 12
+    g1 = _PERM[ii + i1 + _PERM[jj + j1]] % 12
+    g2 = _PERM[ii + 1 + _PERM[jj + 1]] % 12
+
+    total = np.zeros(x.shape, dtype=np.float32)
+    for xc, yc, gc in ((x0, y0, g0), (x1, y1, g1), (x2, y2, g2)):
+        f = np.float32(0.5) - xc * xc - yc * yc
+        contribution = f * f * f * f * (_GRAD_X[gc] * xc + _GRAD_Y[gc] * yc)
+        total += np.where(f > 0, contribution, np.float32(0.0))
+    return total * np.float32(70.0)
+
+
 class NoiseGenerator:
     """
     Handles Simplex noise generation for procedural terrain.
@@ -32,6 +101,19 @@ class NoiseGenerator:
             "snow": 1.0
         }
         
+        # Map biomes to tile types
+        # For now, we only have two tile types implemented, so we'll simplify
+        # Full mapping: water_block, sand_block, grass_block, stone_block and snow_block
+        self.tile_type_mapping = {
+            "deep_water": "red_grass_block",  # Placeholder
+            "shallow_water": "red_grass_block",  # Placeholder
+            "sand": "red_grass_block",
+            "grass": "grass_block",
+            "forest": "grass_block",
+            "mountain": "red_grass_block",
+            "snow": "red_grass_block"
+        }
+        
     def get_noise_at(self, x: int, y: int) -> float:
         """
         Get the noise value at a specific world position.
@@ -83,30 +165,85 @@ class NoiseGenerator:
         Get the tile type for a specific world position based on the biome.
         """
         biome = self.get_biome_at(x, y)
+        return self.tile_type_mapping[biome]
         
-        # Map biomes to tile types
-        biome_to_tile = {
-            "deep_water": "water_block",
-            "shallow_water": "water_block",
-            "sand": "sand_block",
-            "grass": "grass_block",
-            "forest": "grass_block",  # Could be a special forest block
-            "mountain": "stone_block",
-            "snow": "snow_block"
-        }
+    def get_noise_grid(self, x0: int, y0: int, width: int, height: int) -> np.ndarray:
+        """
+        Get the noise values for a whole rectangle of world positions in one call.
+        Returns a (height, width) array indexed as [y - y0, x - x0], matching get_noise_at.
+        """
+        xs = np.arange(x0, x0 + width, dtype=np.float64)
+        ys = np.arange(y0, y0 + height, dtype=np.float64)
+        nx, ny = np.meshgrid((xs + self.offset_x) / self.scale, (ys + self.offset_y) / self.scale)
         
-        # For now, we only have two tile types implemented, so we'll simplify
-        simplified_mapping = {
-            "deep_water": "red_grass_block",  # Placeholder
-            "shallow_water": "red_grass_block",  # Placeholder
-            "sand": "red_grass_block",
-            "grass": "grass_block",
-            "forest": "grass_block",
-            "mountain": "red_grass_block",
-            "snow": "red_grass_block"
-        }
+        value = np.zeros((height, width), dtype=np.float64)
+        max_value = 0
+        amplitude = 1
+        frequency = 1
+        
+        for _ in range(self.octaves):
+            # Same float32 inputs as noise.snoise2(nx * frequency, ny * frequency, base=self.seed)
+            octave = simplex2(
+                (nx * frequency).astype(np.float32) + np.float32(self.seed),
+                (ny * frequency).astype(np.float32) + np.float32(self.seed)
+            )
+            value += octave.astype(np.float64) * amplitude
+            max_value += amplitude
+            amplitude *= self.persistence
+            frequency *= self.lacunarity
+            
+        return value / max_value
+        
+    def _get_biome_index_grid(self, x0: int, y0: int, width: int, height: int) -> np.ndarray:
+        """
+        Get the index into biome_thresholds of the biome at each position of a rectangle.
+        """
+        return self._biome_indices(self.get_noise_grid(x0, y0, width, height))
+    
+    def _biome_indices(self, noise_values: np.ndarray) -> np.ndarray:
+        """Map noise values to indices into biome_thresholds."""
+        # The last threshold is the upper bound of the final biome, so it is not needed
+        bounds = np.array(list(self.biome_thresholds.values())[:-1])
+        return np.searchsorted(bounds, noise_values, side='right')
+    
+    def _elevations(self, noise_values: np.ndarray) -> np.ndarray:
+        """Map noise values to elevations like get_elevation does."""
+        bounds = np.array([
+            self.biome_thresholds["shallow_water"],
+            self.biome_thresholds["forest"],
+            self.biome_thresholds["mountain"]
+        ])
+        return np.searchsorted(bounds, noise_values, side='right').astype(np.uint8)
         
-        return simplified_mapping[biome]
+    def get_biome_grid(self, x0: int, y0: int, width: int, height: int) -> np.ndarray:
+        """
+        Get the biome names for a rectangle of world positions.
+        """
+        biomes = np.array(list(self.biome_thresholds.keys()))
+        return biomes[self._get_biome_index_grid(x0, y0, width, height)]
+    
+    def get_tile_type_grid(self, x0: int, y0: int, width: int, height: int) -> np.ndarray:
+        """
+        Get the tile types for a rectangle of world positions.
+        Chunks sample their area plus a one-tile border with this to cull faces at their edges.
+        """
+        tile_types = np.array([self.tile_type_mapping[biome] for biome in self.biome_thresholds])
+        return tile_types[self._get_biome_index_grid(x0, y0, width, height)]
+    
+    def get_elevation_grid(self, x0: int, y0: int, width: int, height: int) -> np.ndarray:
+        """
+        Get the elevations for a rectangle of world positions, matching get_elevation.
+        """
+        return self._elevations(self.get_noise_grid(x0, y0, width, height))
+    
+    def get_terrain_grid(self, x0: int, y0: int, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the tile types and elevations for a rectangle of world positions,
+        sampling the noise once for both.
+        """
+        noise_values = self.get_noise_grid(x0, y0, width, height)
+        tile_types = np.array([self.tile_type_mapping[biome] for biome in self.biome_thresholds])
+        return tile_types[self._biome_indices(noise_values)], self._elevations(noise_values)
         
     def get_elevation(self, x: int, y: int) -> int:
         """
@@ -0,0 +1,135 @@
+import os
+import mmap
+import struct
+import threading
+import zlib
+import numpy as np
+from typing import Dict, Optional, Tuple
+from world.tiles import TILE_TYPES
+
+class RegionStore:
+    """
+    Stores generated chunk tile ids and column heights in region files on disk.
+    Each region file holds a square group of chunks as fixed-size slots, so a chunk
+    is read straight out of a memory map without parsing the rest of the file.
+
+    File layout:
+        header   - magic, version, chunk size, region size and a palette checksum
+        presence - one byte per chunk slot, 1 when the slot holds data
+        slots    - per chunk, chunk_size * chunk_size tile ids (uint8, row-major)
+                   followed by as many column heights (uint8, row-major)
+    """
+    MAGIC = b'MLRG'
+    VERSION = 2
+    HEADER = struct.Struct('<4sHHHI')
+
+    def __init__(self, directory: str, chunk_size: int, region_size: int = 16):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.region_size = region_size  # Chunks per region side
+
+        # Sizes of the parts of a region file
+        self.layer_size = chunk_size * chunk_size
+        self.slot_size = 2 * self.layer_size
+        self.presence_offset = self.HEADER.size
+        self.slots_offset = self.presence_offset + region_size * region_size
+        self.file_size = self.slots_offset + region_size * region_size * self.slot_size
+
+        # Tile ids are only valid with the palette they were written with
+        self.palette_checksum = zlib.crc32(','.join(TILE_TYPES).encode())
+
+        # Open region maps, shared by the chunk worker threads
+        self.regions: Dict[Tuple[int, int], mmap.mmap] = {}
+        self.files = {}
+        self.lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def get_region_pos(self, chunk_x: int, chunk_y: int) -> Tuple[int, int]:
+        """Get the region coordinates containing the given chunk."""
+        return chunk_x // self.region_size, chunk_y // self.region_size
+
+    def get_slot_index(self, chunk_x: int, chunk_y: int) -> int:
+        """Get the index of the chunk slot inside its region file."""
+        local_x = chunk_x % self.region_size
+        local_y = chunk_y % self.region_size
+        return local_y * self.region_size + local_x
+
+    def _region_path(self, region_pos: Tuple[int, int]) -> str:
+        region_x, region_y = region_pos
+        return os.path.join(self.directory, f"r.{region_x}.{region_y}.mlr")
+
+    def _open_region(self, region_pos: Tuple[int, int], create: bool) -> Optional[mmap.mmap]:
+        """Map a region file into memory, creating an empty one if asked. Caller holds the lock."""
+        if region_pos in self.regions:
+            return self.regions[region_pos]
+
+        path = self._region_path(region_pos)
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, self.chunk_size,
+                                  self.region_size, self.palette_checksum)
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                existing_header = file.read(self.HEADER.size)
+            # Files from another format or tile palette are stale, start them over
+            if existing_header != header or os.path.getsize(path) != self.file_size:
+                if not create:
+                    return None
+                os.remove(path)
+
+        if not os.path.exists(path):
+            if not create:
+                return None
+            with open(path, 'wb') as file:
+                file.write(header)
+                file.truncate(self.file_size)
+
+        file = open(path, 'r+b')
+        region = mmap.mmap(file.fileno(), self.file_size)
+        self.files[region_pos] = file
+        self.regions[region_pos] = region
+        return region
+
+    def load_chunk(self, chunk_x: int, chunk_y: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Read the tile ids and column heights of a chunk as (chunk_size, chunk_size) arrays indexed [y, x].
+        Returns None if the chunk was never stored.
+        """
+        region_pos = self.get_region_pos(chunk_x, chunk_y)
+        slot = self.get_slot_index(chunk_x, chunk_y)
+        with self.lock:
+            region = self._open_region(region_pos, create=False)
+            if region is None or not region[self.presence_offset + slot]:
+                return None
+            layers = np.frombuffer(region, dtype=np.uint8, count=self.slot_size,
+                                   offset=self.slots_offset + slot * self.slot_size)
+            # Copy so the arrays do not keep the map alive
+            tile_ids, heights = layers.reshape(2, self.chunk_size, self.chunk_size).copy()
+            return tile_ids, heights
+
+    def save_chunk(self, chunk_x: int, chunk_y: int, tile_ids: np.ndarray, heights: np.ndarray):
+        """Write the tile ids and column heights of a chunk to its region file."""
+        region_pos = self.get_region_pos(chunk_x, chunk_y)
+        slot = self.get_slot_index(chunk_x, chunk_y)
+        tile_data = np.ascontiguousarray(tile_ids, dtype=np.uint8).tobytes()
+        height_data = np.ascontiguousarray(heights, dtype=np.uint8).tobytes()
+        if len(tile_data) != self.layer_size or len(height_data) != self.layer_size:
+            raise ValueError(f"Expected {self.layer_size} tile ids and heights, "
+                             f"got {len(tile_data)} and {len(height_data)}")
+        data = tile_data + height_data
+
+        with self.lock:
+            region = self._open_region(region_pos, create=True)
+            start = self.slots_offset + slot * self.slot_size
+            region[start:start + self.slot_size] = data
+            region[self.presence_offset + slot] = 1
+
+    def close(self):
+        """Flush and close all open region files."""
+        with self.lock:
+            for region in self.regions.values():
+                region.flush()
+                region.close()
+            for file in self.files.values():
+                file.close()
+            self.regions.clear()
+            self.files.clear()
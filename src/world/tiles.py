@@ -1,12 +1,37 @@
 
 import pygame
 import os
-from sprites import TileFace
-from settings import LAYERS
+import numpy as np
+from atlas import get_atlas
+from support import import_scaled_surfaces, import_surfaces
+from assets import assets
+
+# Tile types that can be stored in chunk data, the index is the tile id (0 is an empty tile)
+TILE_TYPES = ['air', 'grass_block', 'red_grass_block']
+TILE_IDS = {tile_type: tile_id for tile_id, tile_type in enumerate(TILE_TYPES)}
+
+# Bit flags of the visible faces of a block
+FACE_BITS = {'top': 1, 'left': 2, 'right': 4}
+
+# Blocks in the tallest tile column, elevations 0 to 3 are stacked 1 to 4 blocks high
+MAX_HEIGHT = 4
+
+
+def tile_types_to_ids(tile_types: np.ndarray) -> np.ndarray:
+    """Convert an array of tile type names to an array of tile ids."""
+    names, inverse = np.unique(tile_types, return_inverse=True)
+    lookup = np.array([TILE_IDS[str(name)] if name else 0 for name in names], dtype=np.uint8)
+    return lookup[inverse].reshape(tile_types.shape)
+
+
+def tile_ids_to_types(tile_ids: np.ndarray) -> np.ndarray:
+    """Convert an array of tile ids to an array of tile type names (empty tiles become '')."""
+    names = np.array([''] + TILE_TYPES[1:])
+    return names[tile_ids]
 
 class TileRenderer:
     """
-    Handles the rendering of tile faces and face culling.
+    Handles the rendering of tile faces and baking them into chunk surfaces.
     """
     def __init__(self, groups):
         self.groups = groups
@@ -15,6 +40,8 @@ class TileRenderer:
         # Determine tile dimensions based on loaded textures
         self.tile_width = 32 * self._scaled_size  # Base texture is 32x32
         self.tile_height = 32 * self._scaled_size
+        # Screen height of one block in a column, the height of the side faces
+        self.block_height = self.tile_height // 2
         
         # Load the tile textures for different types
         self.tile_textures = self._load_tile_textures()
@@ -24,50 +51,55 @@ class TileRenderer:
         textures = {}
         face_dir = "assets/textures/faces"
         
-        # Check if faces directory exists
-        if not os.path.exists(face_dir):
-            # If not, run the texture splitter
-            from utils.textures import TextureSplitter
-            splitter = TextureSplitter()
-            # This will create the faces directory and populate it
-            # with the split textures
-            splitter.split_all_textures()
+        # Split the tiles that changed since their faces were made (or all of them if there are no faces yet)
+        from utils.textures import TextureSplitter
+        splitter = TextureSplitter(output_dir=face_dir)
+        splitter.split_changed_textures()
         
-        # Load textures for different tile types
-        tile_types = ['grass_block', 'red_grass_block']  # Add more as needed
+        # Find the face file of every tile type, red_grass_block is the fallback for missing ones
+        face_paths = {}
+        for tile_type in TILE_TYPES[1:]:
+            for face_type in ['top', 'left', 'right']:
+                face_path = os.path.join(face_dir, f"{tile_type}_{face_type}.png")
+                if not os.path.exists(face_path):
+                    print(f"Warning: Face texture {face_path} not found! Using fallback.")
+                    face_path = os.path.join(face_dir, f"red_grass_block_{face_type}.png")
+                    if not os.path.exists(face_path):
+                        continue
+                face_paths[f"{tile_type}_{face_type}"] = face_path
+        
+        # Scaled faces are read from the raw cache after the first launch,
+        # until then they are decoded from the packed atlas when it was built
+        atlas = get_atlas()
+        def load_faces(paths):
+            names = [f"faces/{os.path.splitext(os.path.basename(path))[0]}" for path in paths]
+            if atlas and all(name in atlas for name in names):
+                return [atlas.get(name) for name in names]
+            return import_surfaces(paths)
+        # Every tile renderer shares the same faces, each holds them until release_textures
+        self.faces_key = ('scaled_faces', self._scaled_size)
+        scaled_faces = assets.acquire(
+            self.faces_key,
+            lambda: import_scaled_surfaces("faces", face_paths, self._scaled_size, load=load_faces)
+        )
         
-        for tile_type in tile_types:
+        # Load textures for different tile types (add more to TILE_TYPES)
+        for tile_type in TILE_TYPES[1:]:
             textures[tile_type] = {}
             for face_type in ['top', 'left', 'right']:
-                face_path = os.path.join(face_dir, f"{tile_type}_{face_type}.png")
-                if os.path.exists(face_path):
-                    # Load the face texture
-                    face_surface = pygame.image.load(face_path).convert_alpha()
-                    # Scale it
-                    scaled_face = pygame.transform.scale(
-                        face_surface, 
-                        (face_surface.get_width() * self._scaled_size, 
-                         face_surface.get_height() * self._scaled_size)
-                    )
+                scaled_face = scaled_faces.get(f"{tile_type}_{face_type}")
+                if scaled_face:
                     textures[tile_type][face_type] = scaled_face
-                else:
-                    print(f"Warning: Face texture {face_path} not found! Using fallback.")
-                    # Use red_grass_block as fallback if the texture is missing
-                    fallback_path = os.path.join(face_dir, f"red_grass_block_{face_type}.png")
-                    if os.path.exists(fallback_path):
-                        face_surface = pygame.image.load(fallback_path).convert_alpha()
-                        # Scale it
-                        scaled_face = pygame.transform.scale(
-                            face_surface, 
-                            (face_surface.get_width() * self._scaled_size, 
-                             face_surface.get_height() * self._scaled_size)
-                        )
-                        textures[tile_type][face_type] = scaled_face
         
         return textures
     
-    def create_face(self, tile, face_type, tile_type=None):
-        """Create a face for the given tile if it should be visible"""
+    def release_textures(self):
+        """Give the scaled faces back to the asset manager, the renderer can not bake chunks after this."""
+        assets.release(self.faces_key)
+        self.tile_textures = {}
+    
+    def get_face_texture(self, tile_type, face_type):
+        """Get the face texture of a tile type, falling back to grass_block"""
         if tile_type is None:
             tile_type = "grass_block"  # Default
             
@@ -79,57 +111,59 @@ class TileRenderer:
         face_surface = self.tile_textures[tile_type].get(face_type)
         if not face_surface:
             print(f"Warning: No texture for {tile_type}_{face_type}")
-            return
-        
-        # Calculate position offsets for the face based on the tile's position
-        base_x, base_y = tile.pos
-        
-        # Convert world position for z-ordering calculations
-        world_x, world_y = 0, 0
-        if tile.grid_pos:
-            world_x, world_y = tile.grid_pos
-        
-        # Calculate Z-ordering based on world position - this helps with chunk borders
-        # The formula ensures consistent z-ordering across chunk boundaries
-        base_z = (world_x + world_y) / 10000.0
-        
-        # Calculate offset based on the texture splitter's polygon definitions
-        # These offsets should match the polygon coordinates used in TextureSplitter
-        if face_type == 'top':
-            # Top face is centered on the tile
-            offset_x = 0
-            offset_y = 0
-            z_offset = 0.3  # Top face should be above side faces
-        elif face_type == 'right':
-            # Right face should align with the right edge of the isometric tile
-            offset_x = 0
-            offset_y = 0
-            z_offset = 0.2  # Right face above left face
-        elif face_type == 'left':
-            # Left face should align with the left half of the isometric tile
-            offset_x = 0
-            offset_y = 0
-            z_offset = 0.1  # Left face at a lower z-level
-        
-        # Calculate final position - using your original polygon coordinates
-        # Adjust if needed based on your sprite dimensions and hexagon model
-        pos = (base_x + offset_x, base_y + offset_y)
-        
-        # Calculate final z-order that accounts for world position AND face type
-        final_z = LAYERS['ground'] + base_z + z_offset
-        
-        # Create the face sprite
-        face = TileFace(
-            parent_tile=tile,
-            face_type=face_type,
-            pos=pos,
-            surface=face_surface,
-            groups=tile.groups,
-            zlayer=final_z  # Z-ordering that respects world position
-        )
-        
-        # Add the face to the tile
-        tile.add_face(face_type, face)
+        return face_surface
+    
+    def get_chunk_rect(self, origin, chunk_size):
+        """
+        Get the isometric rect covering all face textures of a chunk, with room for the tallest columns.
+        origin is the grid position of the chunk's first tile.
+        """
+        origin_x, origin_y = origin
+        # The west corner is the bottom-left tile, the north corner the origin tile
+        left, _ = self.cart_to_iso(origin_x, origin_y + chunk_size - 1)
+        _, top = self.cart_to_iso(origin_x, origin_y)
+        top -= (MAX_HEIGHT - 1) * self.block_height
+        width = chunk_size * self.tile_width
+        height = (chunk_size - 1) * (self.tile_height // 2) + self.tile_height + (MAX_HEIGHT - 1) * self.block_height
+        return pygame.Rect(left, top, width, height)
+    
+    def bake_chunk(self, origin, tile_ids, face_bits, surface=None):
+        """
+        Composite the visible faces of a chunk into one surface, back to front.
+        face_bits holds the faces of every block indexed [level, local_y, local_x],
+        columns without visible faces cost nothing.
+        Reuses surface when given, it must have the size of get_chunk_rect.
+        """
+        chunk_size = tile_ids.shape[0]
+        chunk_rect = self.get_chunk_rect(origin, chunk_size)
+        if surface is None:
+            surface = pygame.Surface(chunk_rect.size, pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+        
+        origin_x, origin_y = origin
+        face_types = ('left', 'right', 'top')
+        # Every visible face as its block (level, y, x) and the index of its face type
+        faces = [np.nonzero(face_bits & FACE_BITS[face_type]) for face_type in face_types]
+        levels, local_ys, local_xs = (np.concatenate(axis) for axis in zip(*faces))
+        face_indices = np.repeat(np.arange(len(face_types)), [len(face[0]) for face in faces])
+        # A block only overlaps blocks with a different x + y + level, and the larger one is
+        # in front, so that is the drawing order. Within a block side faces go below the top face
+        draw_order = np.lexsort((face_indices, local_xs + local_ys + levels))
+        
+        blit_sequence = []
+        # Face textures share the tile's position, as set by the TextureSplitter polygons
+        for index in draw_order.tolist():
+            level, local_x, local_y = int(levels[index]), int(local_xs[index]), int(local_ys[index])
+            tile_type = TILE_TYPES[tile_ids[local_y, local_x]]
+            face_surface = self.get_face_texture(tile_type, face_types[face_indices[index]])
+            if not face_surface:
+                continue
+            iso_x, iso_y = self.cart_to_iso(origin_x + local_x, origin_y + local_y)
+            iso_y -= level * self.block_height
+            blit_sequence.append((face_surface, (iso_x - chunk_rect.left, iso_y - chunk_rect.top)))
+        
+        surface.blits(blit_sequence, doreturn=False)
+        return surface
         
     def cart_to_iso(self, x, y):
         """
@@ -144,7 +178,7 @@ class TileRenderer:
     def iso_to_cart(self, iso_x, iso_y):
         """
         Convert isometric screen coordinates to cartesian grid coordinates.
-        This is the inverse of cart_to_iso.
+        This is the inverse of cart_to_iso, it works on numbers and numpy arrays alike.
         """
         # Inverse of isometric transform
         half_tile_width = self.tile_width // 2
@@ -154,4 +188,17 @@ class TileRenderer:
         grid_y = (iso_y / quarter_tile_height - iso_x / half_tile_width) / 2
         grid_x = (iso_y / quarter_tile_height + iso_x / half_tile_width) / 2
         
-        return grid_x, grid_y
\ No newline at end of file
+        return grid_x, grid_y
+    
+    def iso_to_ground(self, iso_x, iso_y):
+        """
+        Get the grid coordinates where isometric pixel coordinates meet the top of the
+        lowest blocks, flooring them gives the tile whose lowest top face is drawn there.
+        Takes numbers or numpy arrays of any shape. One level up is one tile further on both axes.
+        """
+        # The top face is a diamond hanging from the middle of the texture's top edge,
+        # that corner is the (0, 0) corner of the tile on the grid
+        return self.iso_to_cart(
+            np.asarray(iso_x, dtype=np.float64) - self.tile_width // 2,
+            np.asarray(iso_y, dtype=np.float64)
+        )
\ No newline at end of file
@@ -1,38 +1,53 @@
 import pygame
+import numpy as np
+from settings import SAVE_DIRECTORY
 from world.chunks import ChunkManager
 from world.noise import NoiseGenerator
+from world.tiles import tile_ids_to_types
 
 class World:
     """
     Main class for the procedural world using Simplex noise.
     Handles the chunk loading/unloading and is the interface to the game world.
     """
-    def __init__(self, groups: pygame.sprite.Group, seed=None):
+    def __init__(self, groups: pygame.sprite.Group, seed=None, save_directory=SAVE_DIRECTORY):
+        # The camera group the world is drawn with, screen queries use its offset and zoom
         self.groups = groups
         
         # Create the noise generator
         self.noise_gen = NoiseGenerator(seed=seed)
         # Create the chunk manager
-        self.chunk_manager = ChunkManager(groups=groups, noise_gen=self.noise_gen)
+        self.chunk_manager = ChunkManager(groups=groups, noise_gen=self.noise_gen, save_directory=save_directory)
         
-    def update(self, player_pos):
+    def update(self, player_pos, wait=False):
         """
         Update the world based on player position.
         This handles loading and unloading chunks.
+        When wait is True, all chunks around the player are built before returning.
         """
-        self.chunk_manager.update_chunks(player_pos)
+        self.chunk_manager.update_chunks(player_pos, wait=wait)
+    
+    def shutdown(self):
+        """
+        Stop background chunk generation.
+        """
+        self.chunk_manager.shutdown()
     
     def get_world_pos_at_screen_pos(self, screen_x, screen_y):
         """
-        Convert a screen position to a world position.
+        Convert a screen position to the grid position of the tile drawn there.
         Useful for mouse interactions.
         """
-        # First convert to isometric coordinates
-        tile_renderer = self.chunk_manager.tile_renderer
-        grid_x, grid_y = tile_renderer.iso_to_cart(screen_x, screen_y)
-        
-        # Round to nearest integer for grid coordinates
-        return int(grid_x), int(grid_y)
+        world_x, world_y = self.get_world_positions_at_screen(screen_x, screen_y)
+        return int(world_x), int(world_y)
+    
+    def get_world_positions_at_screen(self, screen_xs, screen_ys):
+        """
+        Convert arrays of screen positions to the grid positions of the tile columns drawn there,
+        going through the camera offset and zoom of the last frame.
+        """
+        iso_xs, iso_ys = self.groups.screen_to_world(np.asarray(screen_xs), np.asarray(screen_ys))
+        return self.chunk_manager.pick_tiles(iso_xs, iso_ys)
     
     def get_tile_at_world_pos(self, world_x, world_y):
         """
@@ -45,4 +60,23 @@ class World:
         Get the tile at the specified screen position.
         """
         world_x, world_y = self.get_world_pos_at_screen_pos(screen_x, screen_y)
-        return self.get_tile_at_world_pos(world_x, world_y)
\ No newline at end of file
+        return self.get_tile_at_world_pos(world_x, world_y)
+    
+    def get_tile_ids_at_world(self, world_xs, world_ys):
+        """
+        Get the tile ids at arrays of world positions in one call, 0 where there is no tile
+        or its chunk is not loaded. See TILE_TYPES for the ids.
+        """
+        return self.chunk_manager.get_tile_ids(world_xs, world_ys)
+    
+    def get_heights_at_world(self, world_xs, world_ys):
+        """Get the number of blocks in the tile columns at arrays of world positions, 0 where not loaded."""
+        return self.chunk_manager.get_heights(world_xs, world_ys)
+    
+    def get_tile_ids_at_screen(self, screen_xs, screen_ys):
+        """Get the tile ids drawn at arrays of screen positions, e.g. every cell under an area effect."""
+        return self.get_tile_ids_at_world(*self.get_world_positions_at_screen(screen_xs, screen_ys))
+    
+    def get_tiles_at_screen(self, screen_xs, screen_ys):
+        """Get the tile types drawn at arrays of screen positions, '' where there is no tile."""
+        return tile_ids_to_types(self.get_tile_ids_at_screen(screen_xs, screen_ys))
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Golden check of world generation.
+
+Generates a fixed set of chunks for several seeds and compares hashes of their
+tile types, column heights and visible faces with the stored golden file, so changes to the
+noise or chunk code that alter the world are caught. The mean, p50, p99 and max generation
+time per chunk are recorded as well, to compare faster generators against the stored run.
+
+Run from the project root:
+    py src/worldgen_golden.py            compare with common/golden/worldgen.json
+    py src/worldgen_golden.py --update   write the golden file from the current code
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import numpy as np
+from typing import Dict, List, Tuple
+from world.chunks import Chunk
+from world.noise import NoiseGenerator
+from world.tiles import TILE_TYPES
+
+GOLDEN_PATH = os.path.join('common', 'golden', 'worldgen.json')
+SEEDS = [0, 37, 4242, 999999]
+CHUNK_SIZE = 8
+CHUNK_RADIUS = 3  # Chunks from -3 to 3 on both axes around the origin
+
+
+def hash_array(array: np.ndarray) -> str:
+    """Short stable hash of an array's shape and contents."""
+    digest = hashlib.sha256(str(array.shape).encode())
+    digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def hash_tile_types(tile_ids: np.ndarray) -> str:
+    """Hash tile ids by their type names, so reordering TILE_TYPES keeps the hashes."""
+    names = np.array(TILE_TYPES)[tile_ids]
+    return hashlib.sha256(f"{tile_ids.shape}:{','.join(names.ravel())}".encode()).hexdigest()[:16]
+
+
+def time_stats(times: List[float]) -> Dict[str, float]:
+    """Mean, p50, p99 and max of times in seconds, as milliseconds."""
+    ordered = sorted(times)
+    return {
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'p50_ms': ordered[len(ordered) // 2] * 1000,
+        'p99_ms': ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def format_stats(stats: Dict[str, float]) -> str:
+    return (f"mean {stats['mean_ms']:.3f} ms, p50 {stats['p50_ms']:.3f} ms, "
+            f"p99 {stats['p99_ms']:.3f} ms, max {stats['max_ms']:.3f} ms")
+
+
+def generate_seed(seed: int) -> Tuple[Dict[str, List[str]], List[float]]:
+    """
+    Generate every chunk of the fixed area for a seed.
+    Returns the (tile hash, height hash, face hash) of each chunk keyed by 'x,y' and the time each chunk took.
+    """
+    noise_gen = NoiseGenerator(seed=seed)
+    hashes = {}
+    times = []
+    for chunk_y in range(-CHUNK_RADIUS, CHUNK_RADIUS + 1):
+        for chunk_x in range(-CHUNK_RADIUS, CHUNK_RADIUS + 1):
+            # Sampling and building only use the noise, no renderer or sprite groups needed
+            chunk = Chunk((chunk_x, chunk_y), CHUNK_SIZE, tile_renderer=None, noise_gen=noise_gen, groups=None)
+            start = time.perf_counter()
+            chunk.build(*chunk.sample_tiles())
+            times.append(time.perf_counter() - start)
+            hashes[f"{chunk_x},{chunk_y}"] = [
+                hash_tile_types(chunk.tile_ids), hash_array(chunk.heights), hash_array(chunk.face_bits)
+            ]
+    return hashes, times
+
+
+def run(update: bool, budget_ms: float = None) -> bool:
+    """Generate all seeds, then compare with or write the golden file. Returns True if everything matched."""
+    results = {}
+    all_times = []
+    for seed in SEEDS:
+        hashes, times = generate_seed(seed)
+        all_times.extend(times)
+        results[str(seed)] = {'chunks': hashes, **time_stats(times)}
+    stats = time_stats(all_times)
+
+    if update:
+        os.makedirs(os.path.dirname(GOLDEN_PATH), exist_ok=True)
+        golden = {
+            'chunk_size': CHUNK_SIZE,
+            'chunk_radius': CHUNK_RADIUS,
+            **stats,
+            'seeds': results,
+        }
+        with open(GOLDEN_PATH, 'w') as file:
+            json.dump(golden, file, indent=4)
+        print(f"Wrote {GOLDEN_PATH}: {len(SEEDS)} seeds, {len(all_times)} chunks, {format_stats(stats)} per chunk")
+        return True
+
+    if not os.path.exists(GOLDEN_PATH):
+        print(f"No golden file at {GOLDEN_PATH}, run with --update first")
+        return False
+    with open(GOLDEN_PATH) as file:
+        golden = json.load(file)
+    if golden['chunk_size'] != CHUNK_SIZE or golden['chunk_radius'] != CHUNK_RADIUS:
+        print("Golden file was made with other chunk settings, run with --update")
+        return False
+
+    matched = True
+    for seed, result in results.items():
+        golden_chunks = golden['seeds'].get(seed, {}).get('chunks', {})
+        for chunk_pos, (tile_hash, height_hash, face_hash) in result['chunks'].items():
+            expected = golden_chunks.get(chunk_pos)
+            if expected is None or len(expected) != 3:
+                print(f"seed {seed} chunk {chunk_pos}: missing from golden file")
+                matched = False
+            elif expected[0] != tile_hash:
+                print(f"seed {seed} chunk {chunk_pos}: tile types differ")
+                matched = False
+            elif expected[1] != height_hash:
+                print(f"seed {seed} chunk {chunk_pos}: column heights differ")
+                matched = False
+            elif expected[2] != face_hash:
+                print(f"seed {seed} chunk {chunk_pos}: visible faces differ")
+                matched = False
+
+    # Golden files from before the percentiles were stored only have the mean
+    golden_stats = format_stats(golden) if 'p99_ms' in golden else f"mean {golden['mean_ms']:.3f} ms"
+    print(f"{len(all_times)} chunks: {format_stats(stats)} per chunk (golden run {golden_stats})")
+    if budget_ms is not None and stats['mean_ms'] > budget_ms:
+        print(f"Mean chunk time is over the budget of {budget_ms:.3f} ms")
+        matched = False
+    print("Output matches the golden file" if matched else "Output does NOT match the golden file")
+    return matched
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check world generation against the golden file")
+    parser.add_argument('--update', action='store_true', help="Write the golden file from the current code")
+    parser.add_argument('--budget-ms', type=float, help="Fail if the mean time per chunk is over this")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.update, args.budget_ms) else 1)